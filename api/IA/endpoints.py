@@ -1,15 +1,28 @@
 from typing import Dict, Any
 from http import HTTPStatus
+import json
+from flask import Response, stream_with_context
 import utils as app_utils
 from apiflask import Schema, HTTPError
 from apiflask.fields import (
     String as ApiString,
     Decimal as ApiDecimal,
+    Boolean as ApiBoolean,
+    Integer as ApiInteger,
+    Float as ApiFloat,
 )
 from apiflask.validators import (
     Length as ApiLength,
 )
-from IA.models import GeminiManager
+from IA.models import (
+    GeminiManager,
+    CONNECT_TIMEOUT,
+    READ_TIMEOUT,
+    POOL_SIZE,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_MAX_SIZE,
+    RESPONSE_CACHE_DB_MAX_ROWS,
+)
 
 MAX_STRING_LENGTH = 500
 
@@ -39,14 +52,47 @@ class GeminiResponse(BaseSchema):
     response = ApiString()
     generation_time = ApiDecimal(
         required=False)
+    cached = ApiBoolean(
+        required=False,
+        metadata={'description': 'True when the answer comes from the response cache; generation_time is then the original one.'}
+    )
     
 
+class StreamStatsSchema(BaseSchema):
+    """Schema for the latency counters of the streamed answers."""
+    streams = ApiInteger()
+    errors = ApiInteger()
+    cached = ApiInteger()
+    chunks = ApiInteger()
+    chunks_avg = ApiFloat()
+    total_time_avg_ms = ApiFloat()
+    total_time_max_ms = ApiFloat()
+    first_chunk_time_avg_ms = ApiFloat()
+    first_chunk_time_max_ms = ApiFloat()
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event; chunks are sent as unnamed (message) events."""
+    payload = json.dumps(data, default=app_utils.json_default)
+    return f"data: {payload}\n\n" if event == 'chunk' else f"event: {event}\ndata: {payload}\n\n"
+
+
 class EndpointManager:
     """Manages API endpoints and their configuration."""
     
     def __init__(self, app, engine):
         self.app = app
-        self.gemini_manager = GeminiManager(engine)
+        self.gemini_manager = GeminiManager(
+            engine,
+            api_key=app.config.get('GEMINI_API_KEY'),
+            base_url=app.config.get('GEMINI_BASE_URL'),
+            connect_timeout=app.config.get('GEMINI_CONNECT_TIMEOUT', CONNECT_TIMEOUT),
+            read_timeout=app.config.get('GEMINI_READ_TIMEOUT', READ_TIMEOUT),
+            pool_size=app.config.get('GEMINI_POOL_SIZE', POOL_SIZE),
+            cache_ttl=app.config.get('GEMINI_CACHE_TTL', RESPONSE_CACHE_TTL),
+            cache_max_size=app.config.get('GEMINI_CACHE_MAX_SIZE', RESPONSE_CACHE_MAX_SIZE),
+            cache_db_max_rows=app.config.get('GEMINI_CACHE_DB_MAX_ROWS', RESPONSE_CACHE_DB_MAX_ROWS)
+        )
         self.setup_error_handlers()
         self.setup_endpoints()
 
@@ -86,6 +132,33 @@ class EndpointManager:
             result = self.gemini_manager.request(**json_data)
             return app_utils.create_response(result)
 
+        @self.app.post('/gemini/stream')
+        @self.app.doc(
+            tags=['Gemini'],
+            description='Ask to Gemini and receive the answer as Server-Sent Events while it is generated. '
+                        'Each chunk is a message event with {"text"}; the stream ends with a "done" event '
+                        '(cached, generation_time, first_chunk_time, chunks) or an "error" event.'
+        )
+        @self.app.input(GeminiSchema, location='json')
+        def stream_gemini(json_data):
+            app_utils.print_with_format(f"[Gemini] Stream Gemini: {json_data}")
+            events = self.gemini_manager.stream(**json_data)
+            return Response(
+                stream_with_context(sse_event(event, data) for event, data in events),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+
+        @self.app.get('/gemini/stream/stats')
+        @self.app.doc(tags=['Gemini'], description='Total latency, first chunk latency and chunk counts of the streamed answers.')
+        @self.app.output(StreamStatsSchema)
+        def stream_stats():
+            return app_utils.create_response({
+                'data': self.gemini_manager.stream_stats.stats(),
+                'message': 'Stream statistics retrieved successfully.',
+                'status_code': 200
+            })
+
 
 def configure_endpoints(app, engine):
     """Entry point for endpoint configuration."""
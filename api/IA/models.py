@@ -1,29 +1,277 @@
-from typing import List, Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, Tuple
 import utils as app_utils
+import cache as app_cache
+from bak.database import Database
 from google import genai
 from google.genai import types
+from sqlalchemy import String, Text, Float, DateTime, Index, select, delete, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, mapped_column, sessionmaker
+import datetime
+import httpx
 import os,time
-  
+import threading
+
+BASE_NAME = "ia"
+GEMINI_MODEL = "gemini-2.0-flash"
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 60.0
+POOL_SIZE = 10
+KEEPALIVE_EXPIRY = 60.0
+RESPONSE_CACHE_TTL = 86400
+RESPONSE_CACHE_MAX_SIZE = 512
+RESPONSE_CACHE_DB_MAX_ROWS = 10000
+
+
+class CachedResponse(Database.Base):
+    """Gemini answer stored by the database tier of the response cache."""
+    __tablename__ = BASE_NAME + "_" + 'response_cache'
+    __table_args__ = (
+        Index('idx_response_cache_expires_at', 'expires_at'),
+        Index('idx_response_cache_last_used_at', 'last_used_at'),
+    )
+
+    key: Mapped[str] = mapped_column(String(40), primary_key=True)
+    model: Mapped[str] = mapped_column(String(50), nullable=False)
+    response: Mapped[str] = mapped_column(Text, nullable=False)
+    generation_time: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False, default=app_utils.utcnow)
+    last_used_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False, default=app_utils.utcnow)
+    expires_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False)
+
+
+class DatabaseBackend:
+    """
+    Cache backend on the API database, shared by every process and kept across restarts.
+
+    It implements the same interface as cache.LocalBackend. Expired rows are never returned
+    and are purged on writes, together with the least recently used rows above max_rows.
+    Database errors are logged and treated as misses, so the cache never fails a request.
+    """
+
+    def __init__(self, engine, max_rows: int = RESPONSE_CACHE_DB_MAX_ROWS) -> None:
+        self.max_rows = max_rows
+        self.Session = sessionmaker(bind=engine, expire_on_commit=False)
+        Database.Base.metadata.create_all(engine, tables=[CachedResponse.__table__])
+
+    def get(self, key: str) -> Any:
+        return self.get_entry(key)[0]
+
+    def get_entry(self, key: str) -> Tuple[Any, float]:
+        try:
+            with self.Session.begin() as session:
+                now = app_utils.utcnow()
+                row = session.get(CachedResponse, key)
+                if row is None or row.expires_at < now:
+                    return app_cache.MISSING, 0
+                row.last_used_at = now
+                value = {"model": row.model, "response": row.response, "generation_time": row.generation_time}
+                return value, (row.expires_at - now).total_seconds()
+        except Exception as e:
+            app_utils.print_with_format(f"[Gemini] Error reading the response cache {e}", type="warning")
+            return app_cache.MISSING, 0
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            with self.Session.begin() as session:
+                now = app_utils.utcnow()
+                session.execute(delete(CachedResponse).where(CachedResponse.key == key))
+                session.add(CachedResponse(
+                    key=key,
+                    model=value.get("model", GEMINI_MODEL),
+                    response=value["response"],
+                    generation_time=value["generation_time"],
+                    created_at=now,
+                    last_used_at=now,
+                    expires_at=now + datetime.timedelta(seconds=ttl)
+                ))
+                session.flush()
+                self._evict(session, now)
+        except IntegrityError:
+            pass  # Another process stored the same answer first
+        except Exception as e:
+            app_utils.print_with_format(f"[Gemini] Error writing the response cache {e}", type="warning")
+
+    def _evict(self, session, now: datetime.datetime) -> None:
+        session.execute(delete(CachedResponse).where(CachedResponse.expires_at < now))
+        excess = session.scalar(select(func.count()).select_from(CachedResponse)) - self.max_rows
+        if excess > 0:
+            oldest = session.scalars(
+                select(CachedResponse.key).order_by(CachedResponse.last_used_at).limit(excess)
+            ).all()
+            session.execute(delete(CachedResponse).where(CachedResponse.key.in_(oldest)))
+
+    def delete(self, key: str) -> None:
+        try:
+            with self.Session.begin() as session:
+                session.execute(delete(CachedResponse).where(CachedResponse.key == key))
+        except Exception as e:
+            app_utils.print_with_format(f"[Gemini] Error deleting from the response cache {e}", type="warning")
+
+    def delete_prefix(self, prefix: str) -> None:
+        try:
+            with self.Session.begin() as session:
+                session.execute(delete(CachedResponse).where(CachedResponse.key.startswith(prefix)))
+        except Exception as e:
+            app_utils.print_with_format(f"[Gemini] Error deleting from the response cache {e}", type="warning")
+
+
+class StreamStats:
+    """Latency counters of the streamed Gemini answers since the manager was created."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._streams = 0
+        self._errors = 0
+        self._cached = 0
+        self._chunks = 0
+        self._total_time = 0.0
+        self._total_time_max = 0.0
+        self._first_chunk_time = 0.0
+        self._first_chunk_time_max = 0.0
+
+    def record(self, total_time: float, first_chunk_time: Optional[float], chunks: int, cached: bool, error: bool) -> None:
+        with self._lock:
+            self._streams += 1
+            self._errors += error
+            self._cached += cached
+            self._chunks += chunks
+            self._total_time += total_time
+            self._total_time_max = max(self._total_time_max, total_time)
+            if first_chunk_time is not None:
+                self._first_chunk_time += first_chunk_time
+                self._first_chunk_time_max = max(self._first_chunk_time_max, first_chunk_time)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the counters, with times in milliseconds."""
+        with self._lock:
+            streams = self._streams
+            return {
+                'streams': streams,
+                'errors': self._errors,
+                'cached': self._cached,
+                'chunks': self._chunks,
+                'chunks_avg': round(self._chunks / streams, 3) if streams else 0.0,
+                'total_time_avg_ms': round(self._total_time * 1000 / streams, 3) if streams else 0.0,
+                'total_time_max_ms': round(self._total_time_max * 1000, 3),
+                'first_chunk_time_avg_ms': round(self._first_chunk_time * 1000 / streams, 3) if streams else 0.0,
+                'first_chunk_time_max_ms': round(self._first_chunk_time_max * 1000, 3),
+            }
+
+
+class PooledHttpxClient(httpx.Client):
+    """
+    httpx client that always applies its own timeouts.
+
+    The SDK sends a single per-request timeout for every phase, which would replace the
+    separate connect and read timeouts configured on the client.
+    """
+
+    def build_request(self, *args: Any, **kwargs: Any) -> httpx.Request:
+        kwargs['timeout'] = self.timeout
+        return super().build_request(*args, **kwargs)
+
+
 class GeminiManager:
-    def __init__(self, engine) -> None:
+    def __init__(
+        self,
+        engine,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        pool_size: int = POOL_SIZE,
+        cache_ttl: float = RESPONSE_CACHE_TTL,
+        cache_max_size: int = RESPONSE_CACHE_MAX_SIZE,
+        cache_db_max_rows: int = RESPONSE_CACHE_DB_MAX_ROWS,
+        cache=None
+    ) -> None:
         self.engine = engine
+        # Answers are reused for repeated (model, prompt, system instruction): an in-process LRU
+        # in front of a table shared by every worker (memory only when there is no engine)
+        self.cache = cache or app_cache.TTLCache(
+            maxsize=cache_max_size,
+            ttl=cache_ttl,
+            backend=DatabaseBackend(engine, cache_db_max_rows) if engine is not None else None
+        )
+        self.api_key = api_key
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_size = pool_size
+        self._client: Optional[genai.Client] = None
+        self._client_lock = threading.Lock()
+        self.stream_stats = StreamStats()
+
+    @property
+    def client(self) -> genai.Client:
+        """
+        Long-lived Gemini client shared by every request.
+
+        Built on first use so the API starts without a key. The underlying httpx client keeps
+        up to pool_size connections alive, so requests skip the TCP and TLS handshakes.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    http_client = PooledHttpxClient(
+                        timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                        limits=httpx.Limits(
+                            max_connections=self.pool_size,
+                            max_keepalive_connections=self.pool_size,
+                            keepalive_expiry=KEEPALIVE_EXPIRY
+                        )
+                    )
+                    self._client = genai.Client(
+                        api_key=self.api_key or os.getenv("GEMINI_API_KEY"),
+                        http_options=types.HttpOptions(
+                            base_url=self.base_url,
+                            timeout=int(self.read_timeout * 1000),
+                            httpx_client=http_client
+                        )
+                    )
+        return self._client
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    @staticmethod
+    def cache_key(model: str, prompt: str, sys_instruction: Optional[str]) -> str:
+        """Response cache key of a request."""
+        return app_utils.generate_hash("\x00".join((model, prompt, sys_instruction or "")))
 
     def request(self, prompt: str, sys_instruction: str) -> Dict[str, Any]:
-        """Request to the Gemini API."""
+        """Request to the Gemini API, answered from the response cache when possible."""
         try:
-            client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-            start_time = time.time()
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt,
-                config=types.GenerateContentConfig(system_instruction=sys_instruction)
+            cached = True
+
+            def generate() -> Dict[str, Any]:
+                nonlocal cached
+                cached = False
+                start_time = time.time()
+                response = self.client.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(system_instruction=sys_instruction)
+                )
+                end_time = time.time()
+                generation_time = end_time - start_time
+                print(f"Response generation time: {generation_time:.4f} seconds")
+                print(response.text)
+                return {"model": GEMINI_MODEL, "response": response.text, "generation_time": generation_time}
+
+            # Concurrent identical requests share one generation (see TTLCache.get_or_load)
+            answer = self.cache.get_or_load(
+                self.cache_key(GEMINI_MODEL, prompt, sys_instruction),
+                generate,
+                cache_if=lambda answer: bool(answer["response"])
             )
-            end_time = time.time()
-            generation_time = end_time - start_time
-            print(f"Response generation time: {generation_time:.4f} seconds")
-            print(response.text)
-            result = {"generation_time": generation_time, "response": response.text}
-                
+            result = {"generation_time": answer["generation_time"], "response": answer["response"], "cached": cached}
+
             return {
                 'data': result,
                 'message': app_utils.generate_message("Gemini", 'request'),
@@ -37,3 +285,61 @@ class GeminiManager:
                 'result': 'error',
                 'status_code': 400
             }
+
+    def stream(self, prompt: str, sys_instruction: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streams a Gemini answer as it is generated.
+
+        Yields ('chunk', {'text'}) events and a final ('done', metrics) or ('error', {'message'})
+        event. A cached answer is sent as a single chunk; a completed generation is cached.
+        The latency of every stream is recorded in stream_stats, also when the client disconnects.
+        """
+        key = self.cache_key(GEMINI_MODEL, prompt, sys_instruction)
+        start_time = time.perf_counter()
+        first_chunk_time = None
+        chunks = 0
+        cached = False
+        error = False
+        try:
+            answer = self.cache.get(key)
+            if answer is not app_cache.MISSING:
+                cached = True
+                first_chunk_time = time.perf_counter() - start_time
+                chunks = 1
+                yield 'chunk', {'text': answer['response']}
+                generation_time = answer['generation_time']
+            else:
+                parts = []
+                for response in self.client.models.generate_content_stream(
+                    model=GEMINI_MODEL,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(system_instruction=sys_instruction)
+                ):
+                    if not response.text:
+                        continue
+                    if first_chunk_time is None:
+                        first_chunk_time = time.perf_counter() - start_time
+                    chunks += 1
+                    parts.append(response.text)
+                    yield 'chunk', {'text': response.text}
+                generation_time = time.perf_counter() - start_time
+                if parts:
+                    self.cache.set(key, {"model": GEMINI_MODEL, "response": "".join(parts), "generation_time": generation_time})
+            yield 'done', {
+                'cached': cached,
+                'generation_time': generation_time,
+                'first_chunk_time': first_chunk_time,
+                'chunks': chunks
+            }
+        except Exception as e:
+            error = True
+            app_utils.print_with_format(f"[Gemini] Error streaming from Gemini: {e}", type="error")
+            yield 'error', {'message': f"Error requesting to Gemini: {str(e)}"}
+        finally:
+            total_time = time.perf_counter() - start_time
+            self.stream_stats.record(total_time, first_chunk_time, chunks, cached, error)
+            app_utils.print_with_format(
+                f"[Gemini] Stream finished: {chunks} chunks, first chunk "
+                f"{'-' if first_chunk_time is None else f'{first_chunk_time:.4f}s'}, total {total_time:.4f}s"
+                f"{' (cached)' if cached else ''}"
+            )
@@ -5,8 +5,9 @@ from flask import redirect
 from apiflask import APIFlask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-from sqlalchemy import create_engine
 import utils as app_utils
+import database as app_database
+import fastjson
 
 class LifeApp_API:
     def __init__(self):
@@ -39,19 +40,32 @@ class LifeApp_API:
             SQLALCHEMY_DATABASE_URI=self.config.SQLALCHEMY_DATABASE_URI,
             SQLALCHEMY_TRACK_MODIFICATIONS=False,
             BASE_RESPONSE_SCHEMA=app_utils.BaseResponse,
-            BASE_RESPONSE_DATA_KEY='data'
+            BASE_RESPONSE_DATA_KEY='data',
+            FAST_JSON_ENABLED=self.config.FAST_JSON_ENABLED,
+            SQLALCHEMY_ENGINE_OPTIONS=app_database.engine_options(self.config),
+            GEMINI_API_KEY=self.config.GEMINI_API_KEY,
+            GEMINI_BASE_URL=self.config.GEMINI_BASE_URL,
+            GEMINI_CONNECT_TIMEOUT=self.config.GEMINI_CONNECT_TIMEOUT,
+            GEMINI_READ_TIMEOUT=self.config.GEMINI_READ_TIMEOUT,
+            GEMINI_POOL_SIZE=self.config.GEMINI_POOL_SIZE,
+            GEMINI_CACHE_TTL=self.config.GEMINI_CACHE_TTL,
+            GEMINI_CACHE_MAX_SIZE=self.config.GEMINI_CACHE_MAX_SIZE,
+            GEMINI_CACHE_DB_MAX_ROWS=self.config.GEMINI_CACHE_DB_MAX_ROWS
         )
         
+        # Opt-in fast serialization path (precompiled encoders + orjson provider)
+        if self.config.FAST_JSON_ENABLED:
+            app.json = fastjson.FastJSONProvider(app)
+        
         return app
     
     def _setup_database(self) -> SQLAlchemy:
         """Setup database connection and migrations."""
         db = SQLAlchemy(self.app)
         Migrate(self.app, db)
-        self.engine = create_engine(
-            self.config.SQLALCHEMY_DATABASE_URI,
-            pool_pre_ping=True  # Enable connection health checks
-        )
+        # Every module shares Flask-SQLAlchemy's engine, so there is a single pool to size
+        with self.app.app_context():
+            self.engine = db.engine
         return db
     
     def _configure_routes(self):
@@ -61,12 +75,32 @@ class LifeApp_API:
         def home():
             return redirect("/docs", code=302)
         
+        @self.app.get("/system/pool")
+        @self.app.doc(tags=['System'], description='Connection pool telemetry of the shared engine.')
+        @self.app.output(app_database.PoolStatsSchema)
+        def pool_stats():
+            return app_utils.create_response({
+                'data': app_database.pool_stats(self.engine),
+                'message': 'Pool statistics retrieved successfully.',
+                'status_code': 200
+            })
+        
         # Import endpoints here to avoid circular imports
         import goals.endpoints as goals_endpoints
         goals_endpoints.configure_endpoints(self.app, self.engine)
         
+        import health.endpoints as health_endpoints
+        health_endpoints.configure_endpoints(self.app, self.engine)
+        
+        import hobbies.endpoints as hobbies_endpoints
+        hobbies_endpoints.configure_endpoints(self.app, self.engine)
+        
         import IA.endpoints as IA_endpoints
         IA_endpoints.configure_endpoints(self.app, self.engine)
+        
+        # `flask ingest <source> <file>` for the sources registered above
+        import ingest
+        ingest.configure_commands(self.app, self.engine)
     
     def run(self):
         """Run the Flask application."""
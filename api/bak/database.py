@@ -1,4 +1,5 @@
-from utils import print_with_format
+from utils import print_with_format, Config
+from database import engine_options
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy_utils import database_exists, create_database
@@ -10,21 +11,28 @@ class Database():
     """
     Base = declarative_base()
     
-    def __init__(self, DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME) -> None:
+    def __init__(self, DB_USER=None, DB_PASS=None, DB_HOST=None, DB_PORT=None, DB_NAME=None, engine=None) -> None:
         """
         Initializes the database connection.
 
+        Args:
+            engine (Engine): Shared engine to reuse instead of creating a new pool.
+
         Raises:
             Exception: If there is an error connecting to the database.
         """       
         try:
             
-            self.conn_string = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-            self.engine = create_engine(self.conn_string, echo=False, pool_pre_ping=True, pool_recycle=3600, pool_size=10, max_overflow=20, future=True)
-            
-            # Create the database if it does not exist.
-            if not database_exists(self.engine.url):
-                create_database(self.engine.url)
+            if engine is not None:
+                self.engine = engine
+                self.conn_string = engine.url.render_as_string(hide_password=True)
+            else:
+                self.conn_string = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+                self.engine = create_engine(self.conn_string, echo=False, future=True, **engine_options(Config()))
+                
+                # Create the database if it does not exist.
+                if not database_exists(self.engine.url):
+                    create_database(self.engine.url)
             
             self.Session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine, future=True)        
             print_with_format(f"[Database] Connected to the database")
@@ -0,0 +1,170 @@
+"""
+Per-request overhead benchmark for the Gemini clients.
+
+Starts a local HTTP stub that answers generateContent instantly, so the measured time is
+client construction and connection setup rather than generation. Compares a new genai.Client
+per request (the previous GeminiManager.request) with the long-lived pooled client, and a bare
+requests.post with a shared requests.Session (gemini.py).
+
+The stub speaks plain HTTP; against the real API every new connection also pays a TLS handshake,
+so the gap is larger in production.
+
+With --chunk-delay the stub also emulates a generation of STREAM_CHUNKS chunks, and the
+blocking request is compared with the streamed one (time to the first chunk and in total).
+
+Usage:
+    python bench_gemini.py --requests 200
+    python bench_gemini.py --requests 20 --chunk-delay 0.1
+"""
+import argparse
+import itertools
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from google import genai
+from google.genai import types
+from IA.models import GeminiManager, GEMINI_MODEL
+
+STUB_RESPONSE = json.dumps({
+    "candidates": [{"content": {"role": "model", "parts": [{"text": "Hello. meow"}]}, "finishReason": "STOP"}]
+}).encode()
+STREAM_CHUNKS = 5
+
+
+def stub_chunk(text):
+    return json.dumps({"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]})
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if "streamGenerateContent" in self.path:
+            return self.stream()
+        time.sleep(self.server.chunk_delay * STREAM_CHUNKS)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(STUB_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(STUB_RESPONSE)
+
+    def stream(self):
+        # Server-Sent Events until the connection closes, like streamGenerateContent?alt=sse
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for i in range(STREAM_CHUNKS):
+            time.sleep(self.server.chunk_delay)
+            self.wfile.write(f"data: {stub_chunk(f'part {i}. ')}\r\n\r\n".encode())
+            self.wfile.flush()
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(chunk_delay=0.0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.chunk_delay = chunk_delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def measure(call, count):
+    call()  # warm up imports and the first connection
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<32} mean {statistics.mean(timings):7.2f} ms   p50 {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds the stub takes per generated chunk")
+    args = parser.parse_args()
+
+    server, base_url = start_stub()
+    config = types.GenerateContentConfig(system_instruction="You are a cat.")
+
+    def new_client_per_request():
+        client = genai.Client(api_key="bench", http_options=types.HttpOptions(base_url=base_url))
+        client.models.generate_content(model=GEMINI_MODEL, contents="Hi", config=config)
+
+    manager = GeminiManager(None, api_key="bench", base_url=base_url)
+    prompts = itertools.count()
+
+    def shared_client():
+        # A new prompt every time, so the response cache does not answer
+        result = manager.request(f"Hi {next(prompts)}", "You are a cat.")
+        assert result['result'] == 'ok', result['message']
+
+    url = f"{base_url}/v1beta/models/{GEMINI_MODEL}:generateContent"
+    body = json.dumps({"contents": [{"parts": [{"text": "Hi"}]}]})
+    headers = {'Content-Type': 'application/json'}
+    session = requests.Session()
+
+    def bare_post():
+        requests.post(url, headers=headers, data=body, timeout=(5, 60)).raise_for_status()
+
+    def session_post():
+        session.post(url, headers=headers, data=body, timeout=(5, 60)).raise_for_status()
+
+    print(f"{args.requests} requests against {base_url}")
+    report("genai.Client per request", measure(new_client_per_request, args.requests))
+    report("GeminiManager shared client", measure(shared_client, args.requests))
+    report("requests.post", measure(bare_post, args.requests))
+    report("requests.Session", measure(session_post, args.requests))
+
+    manager.close()
+    server.shutdown()
+
+    if args.chunk_delay:
+        stream_blocking_vs_streamed(args)
+
+
+def stream_blocking_vs_streamed(args):
+    server, base_url = start_stub(args.chunk_delay)
+    manager = GeminiManager(None, api_key="bench", base_url=base_url)
+    prompts = itertools.count()
+
+    def blocking():
+        manager.request(f"Hi {next(prompts)}", "You are a cat.")
+
+    first_chunks = []
+
+    def streamed():
+        start = time.perf_counter()
+        first_chunk = None
+        for event, data in manager.stream(f"Hi {next(prompts)}", "You are a cat."):
+            assert event != 'error', data
+            if event == 'chunk' and first_chunk is None:
+                first_chunk = (time.perf_counter() - start) * 1000
+        first_chunks.append(first_chunk)
+
+    print(f"\n{STREAM_CHUNKS} chunks of {args.chunk_delay * 1000:.0f} ms against {base_url}")
+    report("request (blocking)", measure(blocking, args.requests))
+    totals = measure(streamed, args.requests)
+    report("stream, first chunk", first_chunks[1:])  # the first call is the warm-up
+    report("stream, total", totals)
+    print("stream stats", manager.stream_stats.stats())
+    manager.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Insert benchmark for the primary key strategies (ID_STRATEGY).
+
+Creates two scratch tables shaped like goals_goal, one keyed by random UUID4 strings in
+CHAR(36) and one keyed by time-ordered UUID7 values in BINARY(16), inserts the same number
+of rows into each and reports insert throughput and, on MySQL, data and index size.
+
+Usage:
+    python bench_ids.py --rows 200000 --batch 1000
+    python bench_ids.py --url sqlite:///bench.db
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from sqlalchemy import create_engine, MetaData, Table, Column, String, Date, Index, text, insert
+import utils as app_utils
+
+
+def build_table(metadata, name, id_type):
+    return Table(
+        name, metadata,
+        Column('id', id_type, primary_key=True),
+        Column('name', String(100), nullable=False),
+        Column('date', Date, nullable=False),
+        Column('status', String(20), nullable=False),
+        Index(f'idx_{name}_date', 'date'),
+        Index(f'idx_{name}_status', 'status'),
+    )
+
+
+def run(engine, table, generate_id, rows, batch):
+    start = time.perf_counter()
+    today = date.today()
+    with engine.begin() as connection:
+        for offset in range(0, rows, batch):
+            connection.execute(insert(table), [
+                {'id': generate_id(), 'name': f'goal {i}', 'date': today + timedelta(days=i % 365), 'status': 'Pending'}
+                for i in range(offset, min(offset + batch, rows))
+            ])
+    return rows / (time.perf_counter() - start)
+
+
+def table_size(engine, name):
+    if engine.dialect.name != "mysql":
+        return None
+    with engine.begin() as connection:
+        connection.execute(text(f"ANALYZE TABLE {name}"))
+        return connection.execute(text(
+            "SELECT DATA_LENGTH, INDEX_LENGTH FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"
+        ), {'name': name}).one()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Database URL. Defaults to the one configured in .env.')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    url = args.url or app_utils.load_env_vars().SQLALCHEMY_DATABASE_URI
+    engine = create_engine(url)
+    metadata = MetaData()
+    strategies = [
+        ('bench_uuid4_char36', String(36), app_utils.generate_uuid),
+        ('bench_uuid7_binary16', app_utils.BinaryUUID(), app_utils.generate_uuid7),
+    ]
+    tables = [(build_table(metadata, name, id_type), generate_id) for name, id_type, generate_id in strategies]
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    try:
+        for table, generate_id in tables:
+            throughput = run(engine, table, generate_id, args.rows, args.batch)
+            size = table_size(engine, table.name)
+            report = f"[BENCH] {table.name}: {throughput:,.0f} rows/s"
+            if size is not None:
+                report += f", data {size[0] / 2**20:,.1f} MiB, indexes {size[1] / 2**20:,.1f} MiB"
+            app_utils.print_with_format(report)
+    finally:
+        metadata.drop_all(engine)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+import utils as app_utils
+
+MISSING = object()
+
+
+class LocalBackend:
+    """
+    In-process stand-in for a shared cache backend.
+
+    It implements the same interface as RedisBackend, so it can replace it in tests
+    or in single-process deployments.
+    """
+
+    def __init__(self) -> None:
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        return self.get_entry(key)[0]
+
+    def get_entry(self, key: str) -> Tuple[Any, float]:
+        """Returns the value and its remaining lifetime in seconds, or (MISSING, 0)."""
+        with self._lock:
+            value, expires_at = self._data.get(key, (MISSING, 0))
+            remaining = expires_at - time.monotonic()
+            if value is MISSING or remaining < 0:
+                self._data.pop(key, None)
+                return MISSING, 0
+            return value, remaining
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._data if key.startswith(prefix)]:
+                del self._data[key]
+
+
+class RedisBackend:
+    """Shared cache backend on Redis. Requires the optional `redis` package."""
+
+    def __init__(self, url: str, namespace: str = "newlife:") -> None:
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.namespace = namespace
+
+    def get(self, key: str) -> Any:
+        return self.get_entry(key)[0]
+
+    def get_entry(self, key: str) -> Tuple[Any, float]:
+        pipeline = self.client.pipeline()
+        pipeline.get(self.namespace + key)
+        pipeline.pttl(self.namespace + key)
+        value, remaining_ms = pipeline.execute()
+        if value is None or remaining_ms == -2:
+            return MISSING, 0
+        # -1: the key has no expiry (set by another client)
+        return pickle.loads(value), remaining_ms / 1000 if remaining_ms >= 0 else float("inf")
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.client.set(self.namespace + key, pickle.dumps(value), px=int(ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.namespace + key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        keys = list(self.client.scan_iter(match=f"{self.namespace}{prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def build_backend(url: Optional[str] = None):
+    """
+    Builds the shared cache backend configured in CACHE_URL.
+
+    Args:
+        url (str): Backend URL. Defaults to the CACHE_URL environment variable.
+
+    Returns:
+        The backend, or None when no shared backend is configured.
+    """
+    url = url if url is not None else os.getenv("CACHE_URL")
+    if not url:
+        return None
+    if url == "local://":
+        return LocalBackend()
+    if url.startswith(("redis://", "rediss://")):
+        try:
+            return RedisBackend(url)
+        except ImportError:
+            app_utils.print_with_format("[Cache] The redis package is not installed. Using only the local cache.", type="warning")
+            return None
+    app_utils.print_with_format(f"[Cache] Unsupported cache URL {url}. Using only the local cache.", type="warning")
+    return None
+
+
+class _Flight:
+    """A load in progress that concurrent misses on the same key wait for."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value = MISSING
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a TTL and a size bound, optionally backed by a shared backend.
+
+    Lookups go to the in-process LRU first, then to the shared backend. Concurrent misses on
+    the same key are collapsed into a single load (see get_or_load).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60, backend=None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = {}
+        # Bumped on every invalidation so loads that started before it are not stored
+        self._generation = 0
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for key, or MISSING."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at >= time.monotonic():
+                    self._data.move_to_end(key)
+                    return value
+                del self._data[key]
+        if self.backend is not None:
+            value, remaining = self.backend.get_entry(key)
+            if value is not MISSING:
+                # The local copy expires with the shared one, not a full ttl later
+                self._store(key, value, min(self.ttl, remaining))
+            return value
+        return MISSING
+
+    def set(self, key: str, value: Any) -> None:
+        """Store value under key in both tiers."""
+        self._store(key, value)
+        if self.backend is not None:
+            self.backend.set(key, value, self.ttl)
+
+    def _store(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], cache_if: Callable[[Any], bool] = lambda value: True) -> Any:
+        """
+        Return the cached value for key, calling loader on a miss.
+
+        Only one thread runs the loader for a given key; the others wait for its result.
+
+        Args:
+            key (str): Cache key.
+            loader (callable): Loads the value from the source of truth.
+            cache_if (callable): Decides whether a loaded value may be cached.
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                generation = self._generation
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            if cache_if(flight.value):
+                with self._lock:
+                    stale = generation != self._generation
+                if not stale:
+                    self.set(key, flight.value)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, key: str) -> None:
+        """Remove key from both tiers."""
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+        if self.backend is not None:
+            self.backend.delete(key)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """Remove every key that starts with prefix from both tiers."""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._data if key.startswith(prefix)]:
+                del self._data[key]
+        if self.backend is not None:
+            self.backend.delete_prefix(prefix)
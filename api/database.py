@@ -0,0 +1,98 @@
+import threading
+import time
+from typing import Any, Dict
+from apiflask import Schema
+from apiflask.fields import Integer, Float
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+class MonitoredQueuePool(QueuePool):
+    """
+    QueuePool that records how long checkouts wait for a connection and how many time out.
+
+    Recreated pools (engine.dispose(), pool.recreate()) start with fresh counters.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the pool state and checkout counters since the pool was created."""
+        with self._stats_lock:
+            checkouts, timeouts = self._checkouts, self._timeouts
+            wait_total, wait_max = self._wait_total, self._wait_max
+        return {
+            'size': self.size(),
+            'max_overflow': self._max_overflow,
+            'checked_in': self.checkedin(),
+            'checked_out': self.checkedout(),
+            'overflow': max(self.overflow(), 0),
+            'checkouts': checkouts,
+            'timeouts': timeouts,
+            'wait_total_ms': round(wait_total * 1000, 3),
+            'wait_avg_ms': round(wait_total * 1000 / checkouts, 3) if checkouts else 0.0,
+            'wait_max_ms': round(wait_max * 1000, 3),
+        }
+
+
+class PoolStatsSchema(Schema):
+    """Schema for the connection pool telemetry."""
+    size = Integer()
+    max_overflow = Integer()
+    checked_in = Integer()
+    checked_out = Integer()
+    overflow = Integer()
+    checkouts = Integer()
+    timeouts = Integer()
+    wait_total_ms = Float()
+    wait_avg_ms = Float()
+    wait_max_ms = Float()
+
+
+def engine_options(config) -> Dict[str, Any]:
+    """
+    Builds the create_engine() options of the shared engine from the configuration.
+
+    Args:
+        config (Config): Application configuration.
+
+    Returns:
+        dict: Options for SQLALCHEMY_ENGINE_OPTIONS / create_engine().
+    """
+    return {
+        'poolclass': MonitoredQueuePool,
+        'pool_size': config.DB_POOL_SIZE,
+        'max_overflow': config.DB_MAX_OVERFLOW,
+        'pool_recycle': config.DB_POOL_RECYCLE,
+        'pool_timeout': config.DB_POOL_TIMEOUT,
+        'pool_pre_ping': config.DB_POOL_PRE_PING,
+    }
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    """Returns the telemetry of the engine pool, or the basic counters for other pool classes."""
+    pool = engine.pool
+    if isinstance(pool, MonitoredQueuePool):
+        return pool.stats()
+    return {'size': getattr(pool, 'size', lambda: 0)(), 'checked_out': getattr(pool, 'checkedout', lambda: 0)()}
@@ -0,0 +1,148 @@
+import re
+from typing import Any, Callable, Dict
+from flask import current_app, Response
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import fields as ma_fields, missing
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, the encoders still skip marshmallow without it
+    orjson = None
+
+
+# What json.dumps(ensure_ascii=True) escapes besides the control characters orjson already escapes
+_NON_ASCII = re.compile(r'[^\x00-\x7e]')
+
+
+def _escape_non_ascii(match: "re.Match") -> str:
+    """\\u escape of one character, as a surrogate pair outside the BMP (like the json module)."""
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return '\\u{0:04x}\\u{1:04x}'.format(0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return '\\u{0:04x}'.format(code)
+
+
+def _scalar_converter(field: ma_fields.Field) -> Callable[[Any], Any]:
+    """Return a function that formats one value exactly like field._serialize does."""
+    if isinstance(field, ma_fields.Nested):
+        encoder = compile_encoder(field.schema)
+        if field.many:
+            return lambda value: None if value is None else [encoder(item) for item in value]
+        return lambda value: None if value is None else encoder(value)
+    if isinstance(field, ma_fields.List):
+        inner = _scalar_converter(field.inner)
+        return lambda value: None if value is None else [inner(item) for item in value]
+    if isinstance(field, ma_fields.String):
+        return lambda value: None if value is None else str(value)
+    if isinstance(field, ma_fields.Boolean):
+        truthy, falsy = field.truthy, field.falsy
+        def to_bool(value):
+            if value is None:
+                return None
+            if value in truthy:
+                return True
+            if value in falsy:
+                return False
+            return bool(value)
+        return to_bool
+    if isinstance(field, ma_fields.Decimal):
+        # Pre-rendered as the string Flask's provider would emit for the Decimal
+        return lambda value: None if value is None else str(field._format_num(value))
+    if isinstance(field, (ma_fields.Integer, ma_fields.Float)) and not field.as_string:
+        num_type = field.num_type
+        return lambda value: None if value is None else num_type(value)
+    if isinstance(field, ma_fields.Date) and field.format in (None, "iso"):
+        return lambda value: None if value is None else value.isoformat()
+    if type(field) in (ma_fields.Field, ma_fields.Raw):
+        return lambda value: value
+    # Anything else keeps marshmallow's own formatting
+    return lambda value: field._serialize(value, None, None)
+
+
+def compile_encoder(schema) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Compile a schema into a function that dumps a row dict without going through marshmallow.
+
+    The result is the same dict schema.dump() would produce for a to_dict() row.
+
+    Args:
+        schema: Marshmallow schema instance.
+
+    Returns:
+        callable: Encoder for a single row.
+    """
+    plan = []
+    for name, field in schema.dump_fields.items():
+        default = field.dump_default
+        plan.append((field.attribute or name, field.data_key or name, _scalar_converter(field), default))
+
+    def encode(row: Dict[str, Any]) -> Dict[str, Any]:
+        out = {}
+        for attribute, key, convert, default in plan:
+            value = row.get(attribute, missing)
+            if value is missing:
+                if default is missing:
+                    continue
+                value = default() if callable(default) else default
+            out[key] = convert(value)
+        return out
+
+    return encode
+
+
+def response(result: Dict[str, Any], encoder: Callable, many: bool = False) -> Response:
+    """
+    Build the enveloped response (BaseResponse) for a manager result with a compiled encoder.
+
+    Args:
+        result (dict): Result returned by a manager.
+        encoder (callable): Encoder returned by compile_encoder.
+        many (bool): Whether result['data'] is a list of rows.
+
+    Returns:
+        Response: JSON response with the same body the @output decorator would produce.
+    """
+    data = result['data']
+    body = {
+        'message': str(result['message']),
+        'status_code': int(result['status_code']),
+        'data': [encoder(row) for row in data] if many else encoder(data)
+    }
+    if result.get('next_cursor') is not None:
+        body['next_cursor'] = str(result['next_cursor'])
+    rv = current_app.json.response(body)
+    rv.status_code = result['status_code']
+    return rv
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson, falling back to the standard provider when it is missing.
+
+    Keys are sorted and output is compact like the default provider. Dates, decimals and
+    dataclasses go through the default provider's fallback, so they render the same way.
+    Non-ASCII text is \\u escaped afterwards (only inside strings can it appear), so the output
+    is byte-identical to the default provider's ensure_ascii output.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs.get("cls") is not None:
+            return super().dumps(obj, **kwargs)
+        option = (
+            orjson.OPT_SORT_KEYS
+            | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        out = orjson.dumps(obj, default=self.default, option=option).decode()
+        if out.isascii() and "\x7f" not in out:
+            return out
+        return _NON_ASCII.sub(_escape_non_ascii, out)
+
+
+def is_enabled() -> bool:
+    """Whether the opt-in fast serialization path is enabled for the current app."""
+    return bool(current_app.config.get("FAST_JSON_ENABLED"))
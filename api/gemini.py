@@ -1,4 +1,5 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
 from utils import load_env_vars
@@ -7,6 +8,11 @@ config = load_env_vars()
 # The URL for the Gemini API (API_KEY should be set externally or passed as an argument)
 API_KEY = config.GEMINI_API_KEY
 API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={API_KEY}"
+TIMEOUT = (config.GEMINI_CONNECT_TIMEOUT, config.GEMINI_READ_TIMEOUT)  # (connect, read) seconds
+
+# One session for the whole process, so repeated calls reuse the keep-alive connection
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=config.GEMINI_POOL_SIZE))
 
 def generate_content(model="gemini-1.5-flash", prompt="Explain how AI works"):
     """
@@ -27,8 +33,9 @@ def generate_content(model="gemini-1.5-flash", prompt="Explain how AI works"):
         }]
     }
 
+    response = None
     try:
-        response = requests.post(API_URL, headers=headers, data=json.dumps(data))
+        response = session.post(API_URL, headers=headers, data=json.dumps(data), timeout=TIMEOUT)
         response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
 
         try:
@@ -48,7 +55,7 @@ def generate_content(model="gemini-1.5-flash", prompt="Explain how AI works"):
 
     except requests.exceptions.RequestException as e:  # Handle request errors
         print(f"Error communicating with Gemini API: {e}")
-        if response.status_code != 200:
+        if response is not None and response.status_code != 200:
             print(f"Status Code: {response.status_code}")
         try:
             print(f"Response text: {response.text}")  # Print raw response if possible
@@ -58,10 +65,11 @@ def generate_content(model="gemini-1.5-flash", prompt="Explain how AI works"):
 
 
 
-# Example usage:
-generated_text = generate_content(prompt="Que sabes de mi?")  # Or generate_content(prompt="Your prompt here")
+if __name__ == "__main__":
+    # Example usage:
+    generated_text = generate_content(prompt="Que sabes de mi?")  # Or generate_content(prompt="Your prompt here")
 
-if generated_text:
-    print(generated_text)  # Now you can use the generated text
-else:
-    print("Failed to get a valid response from the Gemini API.")
\ No newline at end of file
+    if generated_text:
+        print(generated_text)  # Now you can use the generated text
+    else:
+        print("Failed to get a valid response from the Gemini API.")
\ No newline at end of file
@@ -1,14 +1,19 @@
-from typing import Dict, Any, List
+from typing import Dict, Any
 from http import HTTPStatus
 from datetime import date
+from flask import request
 import utils as app_utils
+import fastjson
 from apiflask import Schema, HTTPError
 from apiflask.fields import (
     Integer as ApiInteger,
     String as ApiString,
     Date as ApiDate,
     Decimal as ApiDecimal,
+    Float as ApiFloat,
+    Dict as ApiDict,
     List as ApiList,
+    DelimitedList as ApiDelimitedList,
     Nested as ApiNested
 )
 from apiflask.validators import (
@@ -18,6 +23,8 @@ from apiflask.validators import (
 )
 from goals.models import GoalManager
 from goals.models import GoalStatus
+from goals.models import LoadStrategy
+from goals.models import GOAL_FIELDS
 
 # Constants
 CURRENCY_CHOICES = ["USD", "CRC", "EUR"]
@@ -25,6 +32,7 @@ MAX_STRING_LENGTH = 100
 MAX_DESCRIPTION_LENGTH = 500
 MAX_UUID_LENGTH = 36
 MAX_NUMBER_VALUE = 1_000_000
+MAX_PAGE_SIZE = 1000
 
 class BaseSchema(Schema):
     """Base schema with common fields and methods."""
@@ -114,7 +122,134 @@ class GoalSchemaOut(GoalSchema):
         example=BaseSchema.generate_example_id()
     )
     
-    
+
+class BulkGoalSchema(GoalSchema):
+    """Schema for a goal in a bulk import; objectives inherit the goal ID."""
+    objectives = ApiList(ApiNested(ObjectiveSchema(exclude=('goal_id',))))
+
+
+class BulkItemSchema(BaseSchema):
+    """Result of a single goal in a bulk import."""
+    index = ApiInteger()
+    id = ApiString()
+    result = ApiString()
+    message = ApiString()
+    objectives = ApiInteger()
+
+
+class BulkResultSchema(BaseSchema):
+    """Schema for bulk import responses."""
+    inserted_goals = ApiInteger()
+    inserted_objectives = ApiInteger()
+    failed = ApiInteger()
+    items = ApiList(ApiNested(BulkItemSchema))
+
+
+class NumericProgressSchema(BaseSchema):
+    """Progress of the numeric objectives of a goal."""
+    count = ApiInteger()
+    current = ApiInteger()
+    target = ApiInteger()
+    ratio = ApiFloat(allow_none=True)
+
+
+class MonetaryProgressSchema(BaseSchema):
+    """Progress of the monetary objectives of a goal in one currency."""
+    currency_unit = ApiString()
+    count = ApiInteger()
+    current = ApiFloat()
+    target = ApiFloat()
+    ratio = ApiFloat()
+
+
+class BooleanProgressSchema(BaseSchema):
+    """Progress of the boolean objectives of a goal."""
+    count = ApiInteger()
+    completed = ApiInteger()
+
+
+class GoalProgressSchema(BaseSchema):
+    """Schema for goal progress responses."""
+    goal_id = ApiString(example=BaseSchema.generate_example_id())
+    status = ApiString(example="In progress")
+    objectives = ApiInteger()
+    completion = ApiFloat(metadata={'description': 'Average completion ratio of the objectives, from 0 to 1.'})
+    numeric = ApiNested(NumericProgressSchema)
+    monetary = ApiList(ApiNested(MonetaryProgressSchema))
+    boolean = ApiNested(BooleanProgressSchema)
+
+
+class GoalCountersSchema(BaseSchema):
+    """Schema for the goal counters response."""
+    total = ApiInteger()
+    by_status = ApiDict(keys=ApiString(), values=ApiInteger(), example={"Pending": 3, "Completed": 1})
+    by_month = ApiDict(
+        keys=ApiString(),
+        values=ApiDict(keys=ApiString(), values=ApiInteger()),
+        example={"2025-03": {"Pending": 2, "Completed": 1}}
+    )
+
+
+class GoalQuerySchema(BaseSchema):
+    """Query parameters for goal read endpoints."""
+    load = ApiString(
+        required=False,
+        validate=ApiOneOf([strategy.value for strategy in LoadStrategy]),
+        metadata={'description': 'How objectives are loaded: selectin, joined or select.'},
+        example=LoadStrategy.SELECTIN.value
+    )
+    fields = ApiDelimitedList(
+        ApiString(validate=ApiOneOf(GOAL_FIELDS)),
+        required=False,
+        metadata={'description': 'Comma-separated goal columns to return. Objectives are omitted unless include=objectives.'},
+        example="id,name,status"
+    )
+    include = ApiDelimitedList(
+        ApiString(validate=ApiOneOf(['objectives'])),
+        required=False,
+        metadata={'description': 'Relationships to return together with fields.'},
+        example="objectives"
+    )
+
+    @staticmethod
+    def projection(query_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Translate the fields/include parameters into GoalManager arguments."""
+        fields = query_data.get('fields')
+        return {
+            'fields': list(dict.fromkeys(fields)) if fields else None,
+            'include_objectives': not fields or 'objectives' in (query_data.get('include') or [])
+        }
+
+
+class GoalFilterSchema(BaseSchema):
+    """Query filters shared by the goal list endpoints."""
+    status = ApiString(
+        required=False,
+        validate=ApiOneOf([miembro.value for miembro in GoalStatus]),
+        example="Pending"
+    )
+    date_from = ApiDate(
+        required=False,
+        metadata={'description': 'Only goals due on or after this date.'}
+    )
+    date_to = ApiDate(
+        required=False,
+        metadata={'description': 'Only goals due on or before this date.'}
+    )
+
+
+class GoalListQuerySchema(GoalQuerySchema, GoalFilterSchema):
+    """Query parameters for the paginated goal list."""
+    limit = ApiInteger(
+        required=False,
+        validate=ApiRange(min=1, max=MAX_PAGE_SIZE),
+        metadata={'description': 'Page size.'},
+        example=100
+    )
+    cursor = ApiString(
+        required=False,
+        metadata={'description': 'The next_cursor value returned by the previous page.'}
+    )
 
 
 class EndpointManager:
@@ -123,8 +258,11 @@ class EndpointManager:
     def __init__(self, app, engine):
         self.app = app
         self.goal_manager = GoalManager(engine)
+        self.goal_encoder = fastjson.compile_encoder(GoalSchema())
+        self.goal_out_encoder = fastjson.compile_encoder(GoalSchemaOut())
         self.setup_error_handlers()
         self.setup_endpoints()
+        self.setup_commands()
         self.initialize_database()
 
     def initialize_database(self):
@@ -156,6 +294,19 @@ class EndpointManager:
         self._setup_goal_endpoints()
         self._setup_objective_endpoints()
 
+    def setup_commands(self):
+        """Configure the goal maintenance CLI commands."""
+        @self.app.cli.command('rebuild-goal-counters')
+        def rebuild_goal_counters():
+            """Recompute the goal status counters from scratch."""
+            drift = self.goal_manager.rebuild_status_counters()
+            for bucket in drift:
+                app_utils.print_with_format(
+                    f"[GOAL-COUNTERS] {bucket['status']} {bucket['month']}: expected {bucket['expected']}, found {bucket['found']}",
+                    type="warning"
+                )
+            app_utils.print_with_format(f"[GOAL-COUNTERS] Counters rebuilt. {len(drift)} buckets corrected.")
+
     def _setup_goal_endpoints(self):
         """Configure goal-related endpoints."""
         
@@ -168,28 +319,119 @@ class EndpointManager:
             result = self.goal_manager.add_goal(**json_data)
             return app_utils.create_response(result)
 
+        @self.app.post('/goal/bulk')
+        @self.app.doc(tags=['Goal'], description='Add many goals with nested objectives in a single transaction.')
+        @self.app.input(BulkGoalSchema(many=True), location='json')
+        @self.app.output(BulkResultSchema, status_code=HTTPStatus.CREATED)
+        def add_goals_bulk(json_data):
+            app_utils.print_with_format(f"[GOAL-ENDPOINT] Adding {len(json_data)} goals in bulk.")
+            result = self.goal_manager.add_goals_bulk(json_data)
+            return app_utils.create_response(result)
+
         @self.app.get('/goal/')
-        @self.app.doc(tags=['Goal'], description='Get all goals.')
+        @self.app.doc(tags=['Goal'], description='Get a page of goals ordered by date. Pass next_cursor back as cursor to get the next page.')
+        @self.app.input(GoalListQuerySchema, location='query')
         @self.app.output(GoalSchemaOut(many=True))
-        def get_goals():
+        def get_goals(query_data):
             try:
                 app_utils.print_with_format("[GOAL-ENDPOINT] Getting all goals.")
-                result = self.goal_manager.get_goals()
-                return app_utils.create_response(result)
+                current = self.goal_manager.get_goals_version()
+                cached = app_utils.not_modified(
+                    app_utils.make_etag(current.version, request.query_string), current.updated_at
+                )
+                if cached is not None:
+                    return cached
+                result = self.goal_manager.get_goals(
+                    limit=query_data.get('limit'),
+                    cursor=query_data.get('cursor'),
+                    status=query_data.get('status'),
+                    date_from=query_data.get('date_from'),
+                    date_to=query_data.get('date_to'),
+                    load_strategy=query_data.get('load'),
+                    version=current.version,
+                    **GoalQuerySchema.projection(query_data)
+                )
+                if fastjson.is_enabled() and result['status_code'] == HTTPStatus.OK:
+                    rv = fastjson.response(result, self.goal_out_encoder, many=True)
+                else:
+                    rv = app_utils.create_response(result)
+                if result['status_code'] != HTTPStatus.OK:
+                    return rv
+                # Validators of the counter the served rows were read at, not of the one checked above
+                served = result['version']
+                etag = app_utils.make_etag(served.version, request.query_string)
+                return app_utils.with_headers(rv, app_utils.conditional_headers(etag, served.updated_at))
             except Exception as e:
                 raise HTTPError(
                     message=f"Error getting goals: {str(e)}", 
                     status_code=HTTPStatus.INTERNAL_SERVER_ERROR
                 )
 
+        @self.app.get('/goal/export')
+        @self.app.doc(
+            tags=['Goal'],
+            description='Stream every matching goal. Send Accept: application/x-ndjson for NDJSON, otherwise a JSON array is streamed.'
+        )
+        @self.app.input(GoalFilterSchema, location='query')
+        def export_goals(query_data):
+            app_utils.print_with_format("[GOAL-ENDPOINT] Streaming goals.")
+            rows = self.goal_manager.iter_goals(**query_data)
+            return app_utils.stream_json_response(self.goal_out_encoder(row) for row in rows)
+
+        @self.app.get('/goal/stats')
+        @self.app.doc(tags=['Goal'], description='Get the number of goals per status and per due month.')
+        @self.app.output(GoalCountersSchema)
+        def get_goal_stats():
+            app_utils.print_with_format("[GOAL-ENDPOINT] Getting goal counters.")
+            result = self.goal_manager.get_status_counters()
+            return app_utils.create_response(result)
+
+        @self.app.get('/goal/progress')
+        @self.app.doc(tags=['Goal'], description='Get the completion of every matching goal.')
+        @self.app.input(GoalFilterSchema, location='query')
+        @self.app.output(GoalProgressSchema(many=True))
+        def get_goals_progress(query_data):
+            app_utils.print_with_format("[GOAL-ENDPOINT] Getting progress of all goals.")
+            result = self.goal_manager.get_progress(**query_data)
+            return app_utils.create_response(result)
+
+        @self.app.get('/goal/<string:goal_id>/progress')
+        @self.app.doc(tags=['Goal'], description='Get the completion of a specific goal.')
+        @self.app.output(GoalProgressSchema)
+        def get_goal_progress(goal_id):
+            app_utils.print_with_format(f"[GOAL-ENDPOINT] Getting progress of goal: {goal_id}")
+            result = self.goal_manager.get_progress(goal_id=goal_id)
+            return app_utils.create_response(result)
+
         @self.app.get('/goal/<string:goal_id>')
         @self.app.doc(tags=['Goal'], description='Get a specific goal.')
+        @self.app.input(GoalQuerySchema, location='query')
         @self.app.output(GoalSchema)
-        def get_goal(goal_id):
+        def get_goal(goal_id, query_data):
             try:
                 app_utils.print_with_format(f"[GOAL-ENDPOINT] Getting goal: {goal_id}")
-                result = self.goal_manager.get_goal(goal_id)
-                return app_utils.create_response(result)
+                current = self.goal_manager.get_goal_version(goal_id)
+                if current is not None:
+                    cached = app_utils.not_modified(
+                        app_utils.make_etag(goal_id, current.version, request.query_string), current.updated_at
+                    )
+                    if cached is not None:
+                        return cached
+                result = self.goal_manager.get_goal(
+                    goal_id,
+                    load_strategy=query_data.get('load'),
+                    version=current.version if current else None,
+                    **GoalQuerySchema.projection(query_data)
+                )
+                if fastjson.is_enabled() and result['status_code'] == HTTPStatus.OK:
+                    rv = fastjson.response(result, self.goal_encoder)
+                else:
+                    rv = app_utils.create_response(result)
+                if result['status_code'] != HTTPStatus.OK:
+                    return rv
+                served = result['version']
+                etag = app_utils.make_etag(goal_id, served.version, request.query_string)
+                return app_utils.with_headers(rv, app_utils.conditional_headers(etag, served.updated_at))
             except Exception as e:
                 raise HTTPError(
                     message=f"Error getting goal: {str(e)}", 
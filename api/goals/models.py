@@ -1,7 +1,9 @@
-from datetime import date
-from typing import List, Optional, Dict, Any
-from sqlalchemy import ForeignKey, String, Integer, Date, Boolean, Float, Index, event
-from sqlalchemy.orm import Mapped, mapped_column, relationship, validates, Session
+from datetime import date, datetime
+from typing import List, Optional, Dict, Any, Iterator
+from sqlalchemy import ForeignKey, String, Integer, Date, DateTime, Boolean, Float, Index, event, and_, or_, insert, case, func, select, delete, update, inspect
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates, Session, Query, object_session
+from sqlalchemy.orm import selectinload, joinedload, lazyload, load_only, noload
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.exc import SQLAlchemyError
 import logging
@@ -9,6 +11,8 @@ from enum import Enum
 from dataclasses import dataclass
 from contextlib import contextmanager
 import utils as app_utils
+import cache as app_cache
+import versions as app_versions
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -23,12 +27,27 @@ class GoalStatus(Enum):
     IN_PROGRESS = "In progress"
     COMPLETED = "Completed"
     CANCELLED = "Cancelled"
+
+
+class LoadStrategy(Enum):
+    """How the objectives of a goal are loaded by the read paths."""
+    SELECTIN = "selectin"  # One extra IN query for all the goals in the result
+    JOINED = "joined"      # A LEFT OUTER JOIN in the same query
+    LAZY = "select"        # One query per goal when objectives are accessed (N+1)
     
 @dataclass
 class ModelConfig:
     NAME_MAX_LENGTH: int = 100
     DESCRIPTION_MAX_LENGTH: int = 500
     VALID_CURRENCIES: tuple = ("USD", "EUR", "CRC")
+    GOALS_LOAD_STRATEGY: LoadStrategy = LoadStrategy.SELECTIN
+    GOAL_LOAD_STRATEGY: LoadStrategy = LoadStrategy.JOINED
+    PAGE_SIZE: int = 100
+    MAX_PAGE_SIZE: int = 1000
+    BULK_CHUNK_SIZE: int = 1000
+    STREAM_CHUNK_SIZE: int = 500
+    CACHE_TTL: int = 60
+    CACHE_MAX_SIZE: int = 1024
 
 class GoalModel(Base):
     __tablename__ = f"{BASE_NAME}_goal"
@@ -37,7 +56,7 @@ class GoalModel(Base):
         Index('idx_goal_status', 'status'),
     )
     
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: app_utils.generate_uuid())
+    id: Mapped[str] = mapped_column(app_utils.id_column_type(), primary_key=True, default=app_utils.generate_id)
     name: Mapped[str] = mapped_column(String(ModelConfig.NAME_MAX_LENGTH), nullable=False)
     description: Mapped[str] = mapped_column(String(ModelConfig.DESCRIPTION_MAX_LENGTH), nullable=False)
     date: Mapped[Date] = mapped_column(Date, nullable=False)
@@ -46,6 +65,9 @@ class GoalModel(Base):
         default=GoalStatus.PENDING.value,
         nullable=False
     )
+    # Row version for ETags; bumped on every update of the goal or insert of one of its objectives
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=app_utils.utcnow, onupdate=app_utils.utcnow)
     
     objectives: Mapped[List["ObjectiveModel"]] = relationship(
         back_populates="goal",
@@ -65,15 +87,17 @@ class GoalModel(Base):
             raise ValueError(f"Invalid status. Must be one of: {', '.join(status.value for status in GoalStatus)}")
         return value
     
-    def to_dict(self) -> Dict[str, Any]:
-        return {
+    def to_dict(self, fields: Optional[List[str]] = None, include_objectives: bool = True) -> Dict[str, Any]:
+        data = {
             'id': self.id,
             'name': self.name,
             'description': self.description,
             "date": self.date,
-            'status': self.status,
-            'objectives': [obj.to_dict() for obj in self.objectives]
-        }
+            'status': self.status
+        } if fields is None else {field: getattr(self, field) for field in fields}
+        if include_objectives:
+            data['objectives'] = [obj.to_dict() for obj in self.objectives]
+        return data
     
     def __repr__(self) -> str:
         return f"Goal(id={self.id}, name={self.name}, status={self.status})"
@@ -82,7 +106,7 @@ class GoalModel(Base):
 class ObjectiveModel(Base):
     __tablename__ = f"{BASE_NAME}_objective"
     
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: app_utils.generate_uuid())
+    id: Mapped[str] = mapped_column(app_utils.id_column_type(), primary_key=True, default=app_utils.generate_id)
     name: Mapped[str] = mapped_column(String(ModelConfig.NAME_MAX_LENGTH))
     description: Mapped[str] = mapped_column(String(ModelConfig.DESCRIPTION_MAX_LENGTH))
     
@@ -94,7 +118,7 @@ class ObjectiveModel(Base):
     end_value: Mapped[Optional[float]] = mapped_column(Float(10, 2), nullable=True)
     currency_unit: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
     
-    goal_id: Mapped[str] = mapped_column(String(36), ForeignKey(f"{BASE_NAME}_goal.id"), nullable=False)
+    goal_id: Mapped[str] = mapped_column(app_utils.id_column_type(), ForeignKey(f"{BASE_NAME}_goal.id"), nullable=False)
     goal: Mapped["GoalModel"] = relationship("GoalModel", back_populates="objectives")
     
     @validates('currency_unit')
@@ -129,10 +153,93 @@ class ObjectiveModel(Base):
     def __repr__(self) -> str:
         return f"[Objective Name={self.name}, Description={self.description}, Start Number={self.start_number}, End Number={self.end_number}, Is Boolean={self.is_boolean}, Start Value={self.start_value}, End Value={self.end_value}, Currency Unit={self.currency_unit}]"
 
+
+class GoalCounterModel(Base):
+    """Number of goals per status and due month, kept up to date by the goal event listeners."""
+    __tablename__ = f"{BASE_NAME}_status_counter"
+    
+    status: Mapped[str] = mapped_column(String(20), primary_key=True)
+    month: Mapped[str] = mapped_column(String(7), primary_key=True)  # YYYY-MM
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'status': self.status,
+            'month': self.month,
+            'total': self.total
+        }
+    
+    def __repr__(self) -> str:
+        return f"GoalCounter(status={self.status}, month={self.month}, total={self.total})"
+
+
+def bump_goal_counter(connection, status: str, goal_date: date, delta: int) -> None:
+    """Add delta to the counter of (status, month of goal_date) on the given connection."""
+    table = GoalCounterModel.__table__
+    values = {'status': status, 'month': goal_date.strftime("%Y-%m"), 'total': delta}
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        statement = mysql.insert(table).values(**values)
+        statement = statement.on_duplicate_key_update(total=table.c.total + delta)
+    elif dialect == "sqlite":
+        statement = sqlite.insert(table).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.status, table.c.month],
+            set_={'total': table.c.total + delta}
+        )
+    else:
+        result = connection.execute(
+            update(table)
+            .where(table.c.status == values['status'], table.c.month == values['month'])
+            .values(total=table.c.total + delta)
+        )
+        if result.rowcount:
+            return
+        statement = insert(table).values(**values)
+    connection.execute(statement)
+
+
+GOAL_FIELDS = ('id', 'name', 'description', 'date', 'status')
+
+
+def goal_load_options(strategy: LoadStrategy, fields: Optional[List[str]], include_objectives: bool) -> list:
+    """Loader options that SELECT only the requested goal columns and skip objectives unless included."""
+    options = []
+    if fields is not None:
+        # date and id are always needed for the keyset cursor
+        options.append(load_only(*[getattr(GoalModel, field) for field in set(fields) | {'id', 'date'}]))
+    options.append(objectives_loader(strategy) if include_objectives else noload(GoalModel.objectives))
+    return options
+
+
+def objectives_loader(strategy: LoadStrategy):
+    """Return the loader option that loads GoalModel.objectives with the given strategy."""
+    loaders = {
+        LoadStrategy.SELECTIN: selectinload,
+        LoadStrategy.JOINED: joinedload,
+        LoadStrategy.LAZY: lazyload,
+    }
+    return loaders[LoadStrategy(strategy)](GoalModel.objectives)
+
    
+def mark_goals_changed(session: Session, connection=None) -> None:
+    """
+    Bump the goals counter once per transaction.
+
+    Cached reads are keyed by it (lists) or by the goal's row version (single goals), so a
+    change never needs to scan the cache: stale entries are not looked up again and age out.
+    """
+    app_versions.mark_changed(session, app_versions.GOALS, connection)
+
+
 class GoalManager:
-    def __init__(self, engine) -> None:
+    def __init__(self, engine, cache: Optional[app_cache.TTLCache] = None) -> None:
         self.engine = engine
+        self.cache = cache or app_cache.TTLCache(
+            maxsize=ModelConfig.CACHE_MAX_SIZE,
+            ttl=ModelConfig.CACHE_TTL,
+            backend=app_cache.build_backend()
+        )
         
     @contextmanager
     def session_scope(self):
@@ -152,6 +259,7 @@ class GoalManager:
         """Create all database tables."""
         try:
             Base.metadata.create_all(self.engine)
+            app_versions.create_table(self.engine, app_versions.GOALS)
             logger.info("Database tables created successfully")
         except SQLAlchemyError as e:
             logger.error(f"Error creating database tables: {str(e)}")
@@ -186,18 +294,79 @@ class GoalManager:
                 'status_code': 400
             }
     
-    def get_goals(self) -> Dict[str, Any]:
-        """Retrieve all goals from the database."""
+    def get_goals(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        load_strategy: Optional[LoadStrategy] = None,
+        fields: Optional[List[str]] = None,
+        include_objectives: bool = True,
+        version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve a page of goals ordered by (date, id), using keyset pagination.
+
+        Cached reads are keyed by the goals counter, so another process never serves a page
+        older than the last committed change. The result carries the counter its rows were
+        read at (result['version']) to build the validators of the response.
+        """
+        limit = min(limit or ModelConfig.PAGE_SIZE, ModelConfig.MAX_PAGE_SIZE)
+        if version is None:
+            version = self.get_goals_version().version
+        key = f"goals:{version}:{limit}:{cursor}:{status}:{date_from}:{date_to}:{fields}:{include_objectives}"
+        return self.cache.get_or_load(
+            key,
+            lambda: self._load_goals(limit, cursor, status, date_from, date_to, load_strategy, fields, include_objectives),
+            cache_if=lambda result: result['status_code'] == 200
+        )
+
+    def _load_goals(
+        self,
+        limit: int,
+        cursor: Optional[str],
+        status: Optional[str],
+        date_from: Optional[date],
+        date_to: Optional[date],
+        load_strategy: Optional[LoadStrategy],
+        fields: Optional[List[str]],
+        include_objectives: bool
+    ) -> Dict[str, Any]:
+        """Load a page of goals from the database."""
+        strategy = load_strategy or ModelConfig.GOALS_LOAD_STRATEGY
+        try:
+            query = self._goals_query(cursor, status, date_from, date_to)
+        except ValueError as e:
+            return {
+                'data': None,
+                'message': str(e),
+                'result': 'error',
+                'status_code': 400
+            }
         try:
             with self.session_scope() as session:
-                goals = session.query(GoalModel).all()
-                result = [goal.to_dict() for goal in goals]
+                snapshot = app_versions.get_version(session, app_versions.GOALS)
+                # One extra row tells us whether there is a next page
+                goals = (
+                    query.with_session(session)
+                    .options(*goal_load_options(strategy, fields, include_objectives))
+                    .limit(limit + 1)
+                    .all()
+                )
+                has_more = len(goals) > limit
+                goals = goals[:limit]
+                result = [goal.to_dict(fields, include_objectives) for goal in goals]
+                next_cursor = app_utils.encode_cursor(goals[-1].date, goals[-1].id) if has_more else None
                 
             return {
                 'data': result,
                 'message': app_utils.generate_message(None, 'get'),
                 'result': 'ok',
-                'status_code': 200
+                'status_code': 200,
+                'next_cursor': next_cursor,
+                'version': snapshot
             }
         except Exception as e:
             logger.error(f"Error retrieving goals: {str(e)}")
@@ -207,12 +376,117 @@ class GoalManager:
                 'result': 'error',
                 'status_code': 500
             }
+
+    def iter_goals(
+        self,
+        status: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every matching goal, fetched in keyset pages of STREAM_CHUNK_SIZE goals.
+
+        Each page is read completely (goals, then one IN query for their objectives) before the
+        next query runs. A server-side cursor would leave an unbuffered result open on the
+        connection while selectinload queries it, which PyMySQL answers by dropping the rest
+        of the result.
+        """
+        cursor = None
+        while True:
+            query = self._goals_query(cursor, status, date_from, date_to)
+            with self.session_scope() as session:
+                goals = (
+                    query.with_session(session)
+                    .options(objectives_loader(LoadStrategy.SELECTIN))
+                    .limit(ModelConfig.STREAM_CHUNK_SIZE)
+                    .all()
+                )
+                page = [goal.to_dict() for goal in goals]
+                cursor = app_utils.encode_cursor(goals[-1].date, goals[-1].id) if goals else None
+            yield from page
+            if len(page) < ModelConfig.STREAM_CHUNK_SIZE:
+                return
+
+    @staticmethod
+    def _goals_query(
+        cursor: Optional[str],
+        status: Optional[str],
+        date_from: Optional[date],
+        date_to: Optional[date]
+    ) -> Query:
+        """Build the filtered, keyset-ordered goals query (served by idx_goal_date / idx_goal_status)."""
+        query = Query(GoalModel)
+        if status:
+            query = query.filter(GoalModel.status == status)
+        if date_from:
+            query = query.filter(GoalModel.date >= date_from)
+        if date_to:
+            query = query.filter(GoalModel.date <= date_to)
+        if cursor:
+            values = app_utils.decode_cursor(cursor)
+            if len(values) != 2:
+                raise ValueError("Invalid cursor")
+            cursor_date, cursor_id = date.fromisoformat(values[0]), values[1]
+            query = query.filter(or_(
+                GoalModel.date > cursor_date,
+                and_(GoalModel.date == cursor_date, GoalModel.id > cursor_id)
+            ))
+        return query.order_by(GoalModel.date, GoalModel.id)
     
-    def get_goal(self, goal_id: str) -> Dict[str, Any]:
-        """Retrieve a specific goal by ID."""
+    def get_goals_version(self) -> app_versions.Version:
+        """Goals counter (version, last change), bumped by every transaction that changes a goal or its objectives."""
+        with self.session_scope() as session:
+            return app_versions.get_version(session, app_versions.GOALS)
+
+    def get_goal_version(self, goal_id: str) -> Optional[app_versions.Version]:
+        """Row version of a goal (version, updated_at), or None if it does not exist."""
+        with self.session_scope() as session:
+            row = session.execute(
+                select(GoalModel.version, GoalModel.updated_at).where(GoalModel.id == goal_id)
+            ).first()
+            return app_versions.Version(row.version, row.updated_at) if row else None
+
+    def get_goal(
+        self,
+        goal_id: str,
+        load_strategy: Optional[LoadStrategy] = None,
+        fields: Optional[List[str]] = None,
+        include_objectives: bool = True,
+        version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve a specific goal by ID.
+
+        Cached reads are keyed by the row version of the goal, which every update of the goal
+        and every new objective bumps. The result carries the version of the served row
+        (result['version']).
+        """
+        if version is None:
+            current = self.get_goal_version(goal_id)
+            version = current.version if current else None
+        return self.cache.get_or_load(
+            f"goal:{goal_id}:{version}:{fields}:{include_objectives}",
+            lambda: self._load_goal(goal_id, load_strategy, fields, include_objectives),
+            cache_if=lambda result: result['status_code'] == 200
+        )
+
+    def _load_goal(
+        self,
+        goal_id: str,
+        load_strategy: Optional[LoadStrategy],
+        fields: Optional[List[str]],
+        include_objectives: bool
+    ) -> Dict[str, Any]:
+        """Load a goal and its objectives from the database."""
+        strategy = load_strategy or ModelConfig.GOAL_LOAD_STRATEGY
         try:
             with self.session_scope() as session:
-                goal = session.query(GoalModel).filter(GoalModel.id == goal_id).first()
+                goal = (
+                    session.query(GoalModel)
+                    .options(*goal_load_options(strategy, fields, include_objectives))
+                    .filter(GoalModel.id == goal_id)
+                    .first()
+                )
                 if not goal:
                     return {
                         'data': None,
@@ -221,13 +495,15 @@ class GoalManager:
                         'status_code': 404
                     }
                 
-                result = goal.to_dict()
+                result = goal.to_dict(fields, include_objectives)
+                snapshot = app_versions.Version(goal.version, goal.updated_at)
                 
             return {
                 'data': result,
                 'message': app_utils.generate_message(None, 'get'),
                 'result': 'ok',
-                'status_code': 200
+                'status_code': 200,
+                'version': snapshot
             }
         except Exception as e:
             logger.error(f"Error retrieving goal {goal_id}: {str(e)}")
@@ -238,6 +514,191 @@ class GoalManager:
                 'status_code': 500
             }
     
+    def get_progress(
+        self,
+        goal_id: Optional[str] = None,
+        status: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Compute goal completion in a single aggregate query, without loading objectives.
+
+        An objective's ratio is start/end, capped at 1, for numeric (start_number/end_number)
+        and monetary (start_value/end_value, grouped per currency_unit) objectives. Boolean
+        objectives have no progress column, so they count as done once the goal is Completed.
+        """
+        statement = self._progress_statement()
+        if goal_id:
+            statement = statement.where(GoalModel.id == goal_id)
+        if status:
+            statement = statement.where(GoalModel.status == status)
+        if date_from:
+            statement = statement.where(GoalModel.date >= date_from)
+        if date_to:
+            statement = statement.where(GoalModel.date <= date_to)
+        try:
+            with self.session_scope() as session:
+                rows = session.execute(statement).all()
+            
+            progress = {}
+            for row in rows:
+                goal = progress.setdefault(row.goal_id, {
+                    'goal_id': row.goal_id,
+                    'status': row.status,
+                    'objectives': 0,
+                    'completion': 0.0,
+                    'numeric': {'count': 0, 'current': 0, 'target': 0, 'ratio': None},
+                    'monetary': [],
+                    'boolean': {'count': 0, 'completed': 0},
+                    '_ratio_sum': 0.0,
+                    '_numeric_ratio_sum': 0.0
+                })
+                goal['objectives'] += row.objectives
+                goal['_ratio_sum'] += (row.numeric_ratio or 0) + (row.monetary_ratio or 0) + (row.boolean_completed or 0)
+                goal['_numeric_ratio_sum'] += row.numeric_ratio or 0
+                goal['numeric']['count'] += row.numeric_count or 0
+                goal['numeric']['current'] += row.numeric_current or 0
+                goal['numeric']['target'] += row.numeric_target or 0
+                goal['boolean']['count'] += row.boolean_count or 0
+                goal['boolean']['completed'] += row.boolean_completed or 0
+                if row.monetary_count:
+                    goal['monetary'].append({
+                        'currency_unit': row.currency_unit,
+                        'count': row.monetary_count,
+                        'current': float(row.monetary_current or 0),
+                        'target': float(row.monetary_target or 0),
+                        'ratio': float(row.monetary_ratio) / row.monetary_count
+                    })
+            
+            for goal in progress.values():
+                ratio_sum = goal.pop('_ratio_sum')
+                numeric_ratio_sum = goal.pop('_numeric_ratio_sum')
+                if goal['objectives']:
+                    goal['completion'] = ratio_sum / goal['objectives']
+                if goal['numeric']['count']:
+                    goal['numeric']['ratio'] = numeric_ratio_sum / goal['numeric']['count']
+            
+            if goal_id:
+                if goal_id not in progress:
+                    return {
+                        'data': None,
+                        'message': app_utils.generate_message(None, 'id_not_found'),
+                        'result': 'error',
+                        'status_code': 404
+                    }
+                result = progress[goal_id]
+            else:
+                result = list(progress.values())
+            
+            return {
+                'data': result,
+                'message': app_utils.generate_message(None, 'get'),
+                'result': 'ok',
+                'status_code': 200
+            }
+        except Exception as e:
+            logger.error(f"Error computing goal progress: {str(e)}")
+            return {
+                'data': None,
+                'message': str(e),
+                'result': 'error',
+                'status_code': 500
+            }
+
+    @staticmethod
+    def _progress_statement():
+        """Per (goal, currency) conditional aggregates over the objectives of each goal."""
+        objective = ObjectiveModel
+        is_boolean = objective.is_boolean == True  # noqa: E712
+        is_numeric = and_(~is_boolean, objective.end_number.isnot(None))
+        is_monetary = and_(~is_boolean, objective.end_number.is_(None), objective.end_value.isnot(None))
+
+        def capped_ratio(current, target):
+            ratio = func.coalesce(current, 0) * 1.0 / target
+            return case((target <= 0, 1.0), (ratio >= 1, 1.0), (ratio <= 0, 0.0), else_=ratio)
+
+        return (
+            select(
+                GoalModel.id.label('goal_id'),
+                GoalModel.status.label('status'),
+                objective.currency_unit.label('currency_unit'),
+                func.count(objective.id).label('objectives'),
+                func.sum(case((is_numeric, 1), else_=0)).label('numeric_count'),
+                func.sum(case((is_numeric, objective.start_number), else_=0)).label('numeric_current'),
+                func.sum(case((is_numeric, objective.end_number), else_=0)).label('numeric_target'),
+                func.sum(case((is_numeric, capped_ratio(objective.start_number, objective.end_number)), else_=0)).label('numeric_ratio'),
+                func.sum(case((is_monetary, 1), else_=0)).label('monetary_count'),
+                func.sum(case((is_monetary, objective.start_value), else_=0)).label('monetary_current'),
+                func.sum(case((is_monetary, objective.end_value), else_=0)).label('monetary_target'),
+                func.sum(case((is_monetary, capped_ratio(objective.start_value, objective.end_value)), else_=0)).label('monetary_ratio'),
+                func.sum(case((is_boolean, 1), else_=0)).label('boolean_count'),
+                func.sum(case((and_(is_boolean, GoalModel.status == GoalStatus.COMPLETED.value), 1), else_=0)).label('boolean_completed'),
+            )
+            .select_from(GoalModel)
+            .outerjoin(objective, objective.goal_id == GoalModel.id)
+            .group_by(GoalModel.id, GoalModel.status, objective.currency_unit)
+        )
+    
+    def get_status_counters(self) -> Dict[str, Any]:
+        """Read the goal counters per status and due month from the summary table."""
+        try:
+            with self.session_scope() as session:
+                counters = session.query(GoalCounterModel).filter(GoalCounterModel.total != 0).all()
+                by_status = {}
+                by_month = {}
+                for counter in counters:
+                    by_status[counter.status] = by_status.get(counter.status, 0) + counter.total
+                    by_month.setdefault(counter.month, {})[counter.status] = counter.total
+                result = {
+                    'total': sum(by_status.values()),
+                    'by_status': by_status,
+                    'by_month': dict(sorted(by_month.items()))
+                }
+                
+            return {
+                'data': result,
+                'message': app_utils.generate_message(None, 'get'),
+                'result': 'ok',
+                'status_code': 200
+            }
+        except Exception as e:
+            logger.error(f"Error retrieving goal counters: {str(e)}")
+            return {
+                'data': None,
+                'message': str(e),
+                'result': 'error',
+                'status_code': 500
+            }
+
+    def rebuild_status_counters(self) -> List[Dict[str, Any]]:
+        """Recompute the counters from the goals table and return the buckets that had drifted."""
+        year = func.extract('year', GoalModel.date)
+        month = func.extract('month', GoalModel.date)
+        with self.session_scope() as session:
+            rows = session.execute(
+                select(GoalModel.status, year, month, func.count())
+                .group_by(GoalModel.status, year, month)
+            ).all()
+            expected = {(status, f"{int(y):04d}-{int(m):02d}"): total for status, y, m, total in rows}
+            current = {
+                (counter.status, counter.month): counter.total
+                for counter in session.query(GoalCounterModel).all()
+            }
+            drift = [
+                {'status': status, 'month': month, 'expected': expected.get((status, month), 0), 'found': current.get((status, month), 0)}
+                for status, month in sorted(set(expected) | set(current))
+                if expected.get((status, month), 0) != current.get((status, month), 0)
+            ]
+            session.execute(delete(GoalCounterModel))
+            if expected:
+                session.execute(
+                    insert(GoalCounterModel),
+                    [{'status': status, 'month': month, 'total': total} for (status, month), total in expected.items()]
+                )
+        logger.info(f"Goal counters rebuilt, {len(drift)} buckets corrected")
+        return drift
+    
     def add_objective(
         self,
         name: str,
@@ -292,11 +753,134 @@ class GoalManager:
                 'status_code': 400
             }
 
+    def add_goals_bulk(self, goals: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Add many goals with their nested objectives in a single transaction."""
+        items = []
+        goal_rows = []
+        objective_rows = []
+        for index, goal in enumerate(goals):
+            try:
+                self._validate_bulk_goal(goal)
+            except ValueError as e:
+                items.append({'index': index, 'id': None, 'result': 'error', 'message': str(e), 'objectives': 0})
+                continue
+            
+            goal_id = app_utils.generate_id()
+            goal_rows.append({
+                'id': goal_id,
+                'name': goal['name'],
+                'description': goal['description'],
+                'date': goal['date'],
+                'status': goal.get('status') or GoalStatus.PENDING.value
+            })
+            objectives = goal.get('objectives') or []
+            objective_rows.extend({
+                'id': app_utils.generate_id(),
+                'name': objective['name'],
+                'description': objective['description'],
+                'start_number': objective.get('start_number'),
+                'end_number': objective.get('end_number'),
+                'is_boolean': bool(objective.get('is_boolean')),
+                'start_value': objective.get('start_value'),
+                'end_value': objective.get('end_value'),
+                'currency_unit': objective.get('currency_unit'),
+                'goal_id': goal_id
+            } for objective in objectives)
+            items.append({'index': index, 'id': goal_id, 'result': 'ok', 'message': None, 'objectives': len(objectives)})
+        
+        try:
+            with self.session_scope() as session:
+                # Multi-row INSERTs; goals go first so the objective foreign keys resolve
+                for rows, model in ((goal_rows, GoalModel), (objective_rows, ObjectiveModel)):
+                    for start in range(0, len(rows), ModelConfig.BULK_CHUNK_SIZE):
+                        session.execute(insert(model), rows[start:start + ModelConfig.BULK_CHUNK_SIZE])
+                # Bulk INSERTs do not fire the after_insert listeners
+                if goal_rows:
+                    mark_goals_changed(session)
+                counters = {}
+                for row in goal_rows:
+                    key = (row['status'], row['date'].replace(day=1))
+                    counters[key] = counters.get(key, 0) + 1
+                connection = session.connection()
+                for (status, month), total in counters.items():
+                    bump_goal_counter(connection, status, month, total)
+        except Exception as e:
+            logger.error(f"Error adding goals in bulk: {str(e)}")
+            return {
+                'data': None,
+                'message': f"Error adding goals in bulk: {str(e)}",
+                'result': 'error',
+                'status_code': 400
+            }
+        
+        failed = sum(1 for item in items if item['result'] == 'error')
+        return {
+            'data': {
+                'inserted_goals': len(goal_rows),
+                'inserted_objectives': len(objective_rows),
+                'failed': failed,
+                'items': items
+            },
+            'message': app_utils.generate_message(f"{len(goal_rows)} goals", 'create'),
+            'result': 'ok',
+            'status_code': 201 if not failed else 207
+        }
+    
+    @staticmethod
+    def _validate_bulk_goal(goal: Dict[str, Any]) -> None:
+        """Apply the model validators that bulk INSERTs bypass."""
+        if goal['date'] < date.today():
+            raise ValueError("Goal date cannot be in the past")
+        status = goal.get('status')
+        if status and status not in [status.value for status in GoalStatus]:
+            raise ValueError(f"Invalid status. Must be one of: {', '.join(status.value for status in GoalStatus)}")
+        for objective in goal.get('objectives') or []:
+            currency_unit = objective.get('currency_unit')
+            if currency_unit and currency_unit not in ModelConfig.VALID_CURRENCIES:
+                raise ValueError(f"Invalid currency. Must be one of: {', '.join(ModelConfig.VALID_CURRENCIES)}")
+
 # Event listeners for logging
 @event.listens_for(GoalModel, 'after_insert')
 def log_goal_creation(mapper, connection, target):
     logger.info(f"New goal created: {target.name}")
+    mark_goals_changed(object_session(target), connection)
+    bump_goal_counter(connection, target.status, target.date, 1)
+
+@event.listens_for(GoalModel, 'after_update')
+def log_goal_update(mapper, connection, target):
+    # Any change moves the goals counter, not only status / date
+    mark_goals_changed(object_session(target), connection)
+    state = inspect(target)
+    status_history = state.attrs.status.history
+    date_history = state.attrs.date.history
+    if not (status_history.has_changes() or date_history.has_changes()):
+        return
+    old_status = status_history.deleted[0] if status_history.deleted else target.status
+    old_date = date_history.deleted[0] if date_history.deleted else target.date
+    logger.info(f"Goal updated: {target.name} ({old_status} -> {target.status})")
+    bump_goal_counter(connection, old_status, old_date, -1)
+    bump_goal_counter(connection, target.status, target.date, 1)
+
+@event.listens_for(GoalModel, 'after_delete')
+def log_goal_deletion(mapper, connection, target):
+    state = inspect(target)
+    status_history = state.attrs.status.history
+    date_history = state.attrs.date.history
+    old_status = status_history.deleted[0] if status_history.deleted else target.status
+    old_date = date_history.deleted[0] if date_history.deleted else target.date
+    logger.info(f"Goal deleted: {target.name}")
+    mark_goals_changed(object_session(target), connection)
+    bump_goal_counter(connection, old_status, old_date, -1)
+
+event.listen(GoalModel, 'before_update', app_utils.bump_row_version)
 
 @event.listens_for(ObjectiveModel, 'after_insert')
 def log_objective_creation(mapper, connection, target):
-    logger.info(f"New objective created: {target.name} for goal {target.goal_id}")
\ No newline at end of file
+    logger.info(f"New objective created: {target.name} for goal {target.goal_id}")
+    mark_goals_changed(object_session(target), connection)
+    goals = GoalModel.__table__
+    connection.execute(
+        update(goals)
+        .where(goals.c.id == target.goal_id)
+        .values(version=goals.c.version + 1, updated_at=app_utils.utcnow())
+    )
\ No newline at end of file
@@ -1,8 +1,9 @@
-from flask import jsonify, make_response
+from flask import jsonify, make_response, request
 import utils as app_utils
+import ingest
 
-from apiflask import Schema, HTTPError
-from apiflask.fields import Integer as apiInteger, String as apiString, Date as apiDate, Decimal as apiDecimal
+from apiflask import Schema
+from apiflask.fields import Integer as apiInteger, String as apiString, Date as apiDate, Decimal as apiDecimal, List as apiList, Nested as apiNested
 from apiflask.validators import Length as apiLength, OneOf as apiOneOf, Range as apiRange
 from health.health import HealthManager
 from sqlalchemy.exc import NoForeignKeysError
@@ -17,6 +18,16 @@ class AddWeight(Schema):
     muscle_mass = apiDecimal(required=True, validate=apiRange(min=0, max=100))
     
     
+class WeightRollupQuery(Schema):
+    period = apiString(load_default='week', validate=apiOneOf(app_utils.DATE_BUCKETS))
+    date_from = apiDate(required=False)
+    date_to = apiDate(required=False)
+
+
+class NutritionQuery(Schema):
+    food_type = apiString(required=False, validate=apiLength(max=40))
+
+
 class AddNutrition(Schema):
     food_type = apiString(required=True, validate=apiLength(max=40))
     name = apiString(required=True, validate=apiLength(max=100))
@@ -37,37 +48,50 @@ class AddMenu(Schema):
     night_snack_id = apiString(required=True, validate=apiLength(max=36))
     
 
-class Get_Menu_Week(Schema):
-    menu_week_id = apiString(required=True, validate=apiLength(max=50))
+class WeekMenuDay(Schema):
+    day_of_week = apiInteger(required=True, validate=apiRange(min=1, max=7))
+    breakfast_id = apiString(required=True, validate=apiLength(max=36))
+    breakfast_snack_id = apiString(required=True, validate=apiLength(max=36))
+    lunch_id = apiString(required=True, validate=apiLength(max=36))
+    afternoon_snack_id = apiString(required=True, validate=apiLength(max=36))
+    dinner_id = apiString(required=True, validate=apiLength(max=36))
+    night_snack_id = apiString(required=True, validate=apiLength(max=36))
+
+
+class AddWeekMenu(Schema):
+    menu_week_id = apiString(required=True, validate=apiLength(max=36))
+    days = apiList(apiNested(WeekMenuDay), required=True, validate=apiLength(equal=7))
+
+
+class WeekMenuOverride(Schema):
+    day_of_week = apiInteger(required=True, validate=apiRange(min=1, max=7))
+    breakfast_id = apiString(required=False, validate=apiLength(max=36))
+    breakfast_snack_id = apiString(required=False, validate=apiLength(max=36))
+    lunch_id = apiString(required=False, validate=apiLength(max=36))
+    afternoon_snack_id = apiString(required=False, validate=apiLength(max=36))
+    dinner_id = apiString(required=False, validate=apiLength(max=36))
+    night_snack_id = apiString(required=False, validate=apiLength(max=36))
+
+
+class CloneWeekMenu(Schema):
+    new_menu_week_id = apiString(required=True, validate=apiLength(max=36))
+    overrides = apiList(apiNested(WeekMenuOverride), required=False, validate=apiLength(max=7))
+
 
- 
 class Result(Schema):
     result = apiString()
     message = apiString()
     
 
-def configure_endpoints(app,database):
-
-    # Define your custom error handler
-    @app.errorhandler(HTTPError)
-    def handle_http_error(error):
-        messages = []
-        for field, field_messages in error.detail["json"].items():
-            for message in field_messages:
-                messages.append(f"{field}: {message}")
-
-        return {
-            "result": "error",
-            "message": messages
-        }, error.status_code
+def configure_endpoints(app, engine):
     
     try:
         
-        database = database
-        health = HealthManager(database)
+        health = HealthManager(engine)
+        health.create_tables()
 
         @app.post('/health/add-weight/')
-        @app.doc(tags=['Health'],description='Add a weight log to the database.')
+        @app.doc(tags=['Health'],description='Add a weight log to the database. A log for a date that already has one replaces it.')
         @app.input(AddWeight, location='json')
         @app.output(Result, status_code=201)
         def add_weight(json_data):
@@ -82,7 +106,7 @@ def configure_endpoints(app,database):
                 muscle_mass = json_data.get('muscle_mass')
 
                 response = health.add_weight(date, weight, imc, body_fat, subcutaneous_fat, visceral_fat, muscle_mass)
-                return make_response(jsonify({'result': response.result, 'message': response.message}), response.status_code)
+                return make_response(jsonify({'result': response['result'], 'message': response['message']}), response['status_code'])
                 
             except Exception as e:
                 app_utils.print_with_format(f"[add-weight] {e} {e.__class__.__name__}", type="error")
@@ -92,8 +116,50 @@ def configure_endpoints(app,database):
         @app.doc(tags=['Health'],description='Get all the weight logs from the database.')
         @app.output(Result, status_code=200)
         def get_health():
-            result = health.get_weights()
-            return jsonify(result)
+            current = health.get_weights_version()
+            cached = app_utils.not_modified(app_utils.make_etag(current.version), current.updated_at)
+            if cached is not None:
+                return cached
+            # The validators come from the counter the served logs were read at
+            served, result = health.get_weights()
+            response = jsonify(result)
+            response.headers.update(app_utils.conditional_headers(app_utils.make_etag(served.version), served.updated_at))
+            return response
+        
+        
+        ingestor = ingest.Ingestor(engine)
+        weights_source = ingest.Source('weights', AddWeight(), health.write_weights)
+        ingest.register_source(weights_source)
+        ingest.register_source(ingest.Source('nutrition', AddNutrition(), health.write_nutrition))
+        
+        @app.post('/health/weights/import')
+        @app.doc(tags=['Health'],description='Import a smart-scale export (CSV or NDJSON, as a "file" upload or as the request body). Readings are upserted on their date, so retrying an import is safe.')
+        @app.output(Result, status_code=200)
+        def import_weights():
+            try:
+                upload = request.files.get('file')
+                if upload is not None:
+                    fmt = app_utils.record_format(upload.mimetype, upload.filename)
+                    stream = upload.stream
+                else:
+                    fmt = app_utils.record_format(request.mimetype)
+                    stream = request.stream
+                return jsonify(ingestor.run(weights_source, stream, fmt))
+            except Exception as e:
+                app_utils.print_with_format(f"[weights-import] {e} {e.__class__.__name__}", type="error")
+                return make_response(jsonify({'result': 'error', 'message': str(e)}), 500)
+        
+        @app.get('/health/weights/rollup')
+        @app.doc(tags=['Health'],description='Get min/max/mean of weight, body fat and muscle mass per day, week or month, with 7 and 30 entry moving averages.')
+        @app.input(WeightRollupQuery, location='query')
+        @app.output(Result, status_code=200)
+        def get_weight_rollup(query_data):
+            try:
+                result = health.get_weight_rollup(query_data['period'], query_data.get('date_from'), query_data.get('date_to'))
+                return jsonify(result)
+            except Exception as e:
+                app_utils.print_with_format(f"[weights-rollup] {e} {e.__class__.__name__}", type="error")
+                return make_response(jsonify({'result': 'error', 'message': str(e)}), 500)
         
         
         @app.post('/health/add-nutrition/')
@@ -112,10 +178,11 @@ def configure_endpoints(app,database):
                 return jsonify({'result': 'error', 'message': str(e)})
             
         @app.get('/health/get-nutrition/')
-        @app.doc(tags=['Health'],description='Get all nutrition logs from the database.')
+        @app.doc(tags=['Health'],description='Get the nutrition logs, optionally only those of a food type. Served from the in-memory catalog.')
+        @app.input(NutritionQuery, location='query')
         @app.output(Result, status_code=200)
-        def get_nutrition():
-            result = health.get_nutrition()
+        def get_nutrition(query_data):
+            result = health.get_nutrition(query_data.get('food_type'))
             return jsonify(result)
         
         @app.post('/health/add-menu/')
@@ -130,17 +197,34 @@ def configure_endpoints(app,database):
                 app_utils.print_with_format(f"[add-menu] {e} {e.__class__.__name__}", type="error")
                 return jsonify({'result': 'error', 'message': str(e)})
             
-        @app.get('/health/get-menu/<int:menu_week_id>')
-        @app.doc(tags=['Health'],description='Get the menu from the selected week menu')
-        @app.input(Get_Menu_Week, location='json')
+        @app.post('/health/menu-week/')
+        @app.doc(tags=['Health'],description='Add the menus of a full week (7 days) in a single transaction')
+        @app.input(AddWeekMenu, location='json')
+        @app.output(Result, status_code=201)
+        def add_week_menu(json_data):
+            response = health.create_week_menu(json_data['menu_week_id'], json_data['days'])
+            return make_response(jsonify({'result': response['result'], 'message': response['message']}), response['status_code'])
+            
+        @app.post('/health/menu-week/<string:menu_week_id>/clone')
+        @app.doc(tags=['Health'],description='Copy a week menu into a new week inside the database, optionally replacing some meals per day')
+        @app.input(CloneWeekMenu, location='json')
+        @app.output(Result, status_code=201)
+        def clone_week_menu(menu_week_id, json_data):
+            response = health.clone_week_menu(menu_week_id, json_data['new_menu_week_id'], json_data.get('overrides'))
+            return make_response(jsonify({'result': response['result'], 'message': response['message']}), response['status_code'])
+            
+        @app.get('/health/get-menu/<string:menu_week_id>')
+        @app.doc(tags=['Health'],description='Get the menu of the selected week with the meal names, prices and the daily and weekly cost')
         @app.output(Result, status_code=200)
         def get_menu(menu_week_id):
             try:
                 result = health.get_menu_week(menu_week_id)
+                if result is None:
+                    return make_response(jsonify({'result': 'error', 'message': f'Menu week {menu_week_id} not found'}), 404)
                 return jsonify(result)
             except Exception as e:
                 app_utils.print_with_format(e, type="error")
-                return jsonify({'result': 'error', 'message': str(e)})
+                return make_response(jsonify({'result': 'error', 'message': str(e)}), 500)
     
     except Exception as e:
         app_utils.print_with_format(e, type="error")
@@ -1,16 +1,35 @@
+import threading
+import time
 from dataclasses import dataclass
-from sqlalchemy import create_engine, ForeignKey, String, Integer, Date, Column, Numeric, DateTime, Float
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Tuple
+from sqlalchemy import ForeignKey, String, Integer, Date, Column, Numeric, Float, Index, event, func, select, case, inspect, insert, update, literal
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Mapped, mapped_column, relationship, sessionmaker, object_session
+from contextlib import contextmanager
+from decimal import Decimal
 import utils as app_utils
+import cache as app_cache
+import versions as app_versions
 from bak.database import Database
 
 BASE_NAME = "health"
+ROLLUP_METRICS = ("weight", "body_fat", "muscle_mass")
+MOVING_AVERAGE_WINDOWS = (7, 30)
+MEALS = ("breakfast", "breakfast_snack", "lunch", "afternoon_snack", "dinner", "night_snack")
+MENU_CACHE_TTL = 300
+WEIGHT_VALUE_COLUMNS = ("weight", "imc", "body_fat", "subcutaneous_fat", "visceral_fat", "muscle_mass")
+MENU_CACHE_MAX_SIZE = 256
+NUTRITION_CATALOG = "nutrition"
+CATALOG_CHECK_INTERVAL = 5
 
 @dataclass
 class Weight(Database.Base):
     __tablename__ = BASE_NAME + "_" +  'weight'
+    # One reading per date: weight imports upsert on it
+    __table_args__ = (Index('idx_weight_date', 'date', unique=True),)
     
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=app_utils.generate_uuid)
+    id: Mapped[str] = mapped_column(app_utils.id_column_type(), primary_key=True, default=app_utils.generate_id)
     date: Mapped[Date] = mapped_column(Date, nullable=False)
     weight: Mapped[float] = mapped_column(Numeric(5, 2), nullable=False)
     imc: Mapped[float] = mapped_column(Float, nullable=False)
@@ -37,11 +56,74 @@ class Weight(Database.Base):
             f"visceral_fat={self.visceral_fat}, muscle_mass={self.muscle_mass})"
         )
 
+
+@event.listens_for(Weight, 'after_insert')
+@event.listens_for(Weight, 'after_update')
+@event.listens_for(Weight, 'after_delete')
+def weight_changed(mapper, connection, target):
+    app_versions.mark_changed(object_session(target), app_versions.WEIGHTS, connection)
+
+
+def weight_values(row):
+    """
+    Normalizes the measures of a weight row the way the columns store them.
+    
+    Args:
+        row (dict|Row): Weight values by column name.
+    
+    Returns:
+        tuple: Values of WEIGHT_VALUE_COLUMNS, comparable between imported and stored rows.
+    """
+    values = []
+    for column in WEIGHT_VALUE_COLUMNS:
+        value = row[column] if column in row else None
+        if value is None:
+            values.append(None)
+        elif column == "weight":
+            values.append(Decimal(str(value)).quantize(Decimal("0.01")))
+        else:
+            values.append(float(value))
+    return tuple(values)
+
+
+def upsert_weights(connection, rows):
+    """
+    Inserts weight rows, updating the existing reading of the same date (unique idx_weight_date).
+    
+    Args:
+        connection (Connection): Connection of the current transaction.
+        rows (list): Complete rows (id, date and measures).
+    """
+    table = Weight.__table__
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        statement = mysql.insert(table)
+        statement = statement.on_duplicate_key_update(
+            **{column: statement.inserted[column] for column in WEIGHT_VALUE_COLUMNS}
+        )
+    elif dialect == "sqlite":
+        statement = sqlite.insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.date],
+            set_={column: statement.excluded[column] for column in WEIGHT_VALUE_COLUMNS}
+        )
+    else:
+        for row in rows:
+            result = connection.execute(
+                update(table)
+                .where(table.c.date == row['date'])
+                .values(**{column: row[column] for column in WEIGHT_VALUE_COLUMNS})
+            )
+            if not result.rowcount:
+                connection.execute(insert(table).values(**row))
+        return
+    connection.execute(statement, rows)
+
 @dataclass
 class Nutrition(Database.Base):
     __tablename__ = BASE_NAME + "_" +  'nutrition'
     
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=app_utils.generate_uuid)
+    id: Mapped[str] = mapped_column(app_utils.id_column_type(), primary_key=True, default=app_utils.generate_id)
     food_type: Mapped[str] = mapped_column(String(40))
     name: Mapped[str] = mapped_column(String(100))
     portion: Mapped[str] = mapped_column(String(36))
@@ -65,15 +147,15 @@ class Nutrition(Database.Base):
 class Menu(Database.Base):
     __tablename__ = BASE_NAME + "_" +  'nutrition_menu'
 
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=app_utils.generate_uuid)
+    id: Mapped[str] = mapped_column(app_utils.id_column_type(), primary_key=True, default=app_utils.generate_id)
     day_of_week: Mapped[int] = mapped_column(Integer)
     menu_week_id: Mapped[str] = mapped_column(String(36))
-    breakfast_id: Mapped[str] = Column(String(36), ForeignKey(f"{BASE_NAME}_nutrition.id"), nullable=False)
-    breakfast_snack_id: Mapped[str] = Column(String(36), ForeignKey(f"{BASE_NAME}_nutrition.id"), nullable=False)
-    lunch_id: Mapped[str] = Column(String(36), ForeignKey(f"{BASE_NAME}_nutrition.id"), nullable=False)
-    afternoon_snack_id: Mapped[str] = Column(String(36), ForeignKey(f"{BASE_NAME}_nutrition.id"), nullable=False)
-    dinner_id: Mapped[str] = Column(String(36), ForeignKey(f"{BASE_NAME}_nutrition.id"), nullable=False)
-    night_snack_id: Mapped[str] = Column(String(36), ForeignKey(f"{BASE_NAME}_nutrition.id"), nullable=False)
+    breakfast_id: Mapped[str] = Column(app_utils.id_column_type(), ForeignKey(f"{BASE_NAME}_nutrition.id"), nullable=False)
+    breakfast_snack_id: Mapped[str] = Column(app_utils.id_column_type(), ForeignKey(f"{BASE_NAME}_nutrition.id"), nullable=False)
+    lunch_id: Mapped[str] = Column(app_utils.id_column_type(), ForeignKey(f"{BASE_NAME}_nutrition.id"), nullable=False)
+    afternoon_snack_id: Mapped[str] = Column(app_utils.id_column_type(), ForeignKey(f"{BASE_NAME}_nutrition.id"), nullable=False)
+    dinner_id: Mapped[str] = Column(app_utils.id_column_type(), ForeignKey(f"{BASE_NAME}_nutrition.id"), nullable=False)
+    night_snack_id: Mapped[str] = Column(app_utils.id_column_type(), ForeignKey(f"{BASE_NAME}_nutrition.id"), nullable=False)
     
     breakfast = relationship("Nutrition", foreign_keys=[breakfast_id])
     breakfast_snack = relationship("Nutrition", foreign_keys=[breakfast_snack_id])
@@ -95,17 +177,217 @@ class Menu(Database.Base):
     def __repr__(self) -> str:
         return f"[Day of Week={self.day_of_week}, Menu Week ID={self.menu_week_id}, Breakfast ID={self.breakfast_id}, Breakfast Snack ID={self.breakfast_snack_id}, Lunch ID={self.lunch_id}, Afternoon Snack ID={self.afternoon_snack_id}, Dinner ID={self.dinner_id}, Night Snack ID={self.night_snack_id}]"
         
+
+
+def mark_menu_week_changed(session, menu_week_id):
+    """
+    Records a changed week menu so its cached view is dropped once the transaction commits.
+    
+    Args:
+        session (Session): Session of the transaction.
+        menu_week_id (str): The id of the week menu.
+    """
+    if session is not None and menu_week_id is not None:
+        session.info.setdefault('changed_menu_weeks', set()).add(str(menu_week_id))
+
+
+@event.listens_for(Menu, 'after_insert')
+@event.listens_for(Menu, 'after_delete')
+def menu_changed(mapper, connection, target):
+    mark_menu_week_changed(object_session(target), target.menu_week_id)
+
+
+@event.listens_for(Menu, 'after_update')
+def menu_updated(mapper, connection, target):
+    session = object_session(target)
+    mark_menu_week_changed(session, target.menu_week_id)
+    # A menu moved to another week also changes the week it left
+    for old_week in inspect(target).attrs.menu_week_id.history.deleted:
+        mark_menu_week_changed(session, old_week)
+
+
+class CatalogVersion(Database.Base):
+    """Version of a cached catalog, bumped in the same transaction as every change to it."""
+    __tablename__ = BASE_NAME + "_" + 'catalog_version'
+    
+    name: Mapped[str] = mapped_column(String(40), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+def bump_catalog_version(connection, name=NUTRITION_CATALOG):
+    """
+    Increments the version of a catalog on the connection of the current transaction.
+    
+    Args:
+        connection (Connection): Connection of the transaction that changes the catalog.
+        name (str): Name of the catalog.
+    """
+    table = CatalogVersion.__table__
+    result = connection.execute(update(table).where(table.c.name == name).values(version=table.c.version + 1))
+    if not result.rowcount:
+        connection.execute(insert(table).values(name=name, version=1))
+
+
+def mark_catalog_changed(session, connection):
+    """
+    Bumps the nutrition catalog version once per transaction and flags the session, so the local
+    snapshot is checked again right after the commit.
+    
+    Args:
+        session (Session): Session of the transaction.
+        connection (Connection): Its connection.
+    """
+    if session is None or not session.info.get('catalog_changed'):
+        bump_catalog_version(connection)
+    if session is not None:
+        session.info['catalog_changed'] = True
+
+
+@event.listens_for(Nutrition, 'after_insert')
+@event.listens_for(Nutrition, 'after_update')
+@event.listens_for(Nutrition, 'after_delete')
+def nutrition_changed(mapper, connection, target):
+    mark_catalog_changed(object_session(target), connection)
+
+
+class NutritionItem(NamedTuple):
+    id: str
+    food_type: str
+    name: str
+    portion: str
+    example: str
+    recipe: str
+    price: float
+
+
+@dataclass(frozen=True)
+class NutritionCatalog:
+    """
+    Immutable in-memory snapshot of the nutrition catalog, indexed by id and by food type.
+    
+    A snapshot is never modified: a newer catalog version replaces it as a whole, so readers
+    can use it without locks.
+    """
+    version: int
+    items: Tuple[NutritionItem, ...]
+    by_id: Mapping[str, NutritionItem]
+    by_food_type: Mapping[str, Tuple[NutritionItem, ...]]
+    
+    @classmethod
+    def build(cls, version, items):
+        """
+        Builds a snapshot and its indexes.
+        
+        Args:
+            version (int): Catalog version the items were read at.
+            items (list): NutritionItem rows.
+        
+        Returns:
+            NutritionCatalog: The snapshot.
+        """
+        items = tuple(items)
+        by_food_type = {}
+        for item in items:
+            by_food_type.setdefault(item.food_type, []).append(item)
+        return cls(
+            version=version,
+            items=items,
+            by_id=MappingProxyType({item.id: item for item in items}),
+            by_food_type=MappingProxyType({food_type: tuple(group) for food_type, group in by_food_type.items()})
+        )
+
    
 class HealthManager():
-    def __init__(self,database) -> None:
+    def __init__(self, engine, cache=None) -> None:
         try:
-            self.db = database
-            self.session = database.Session()
-            app_utils.print_with_format(f"[Health] The database session was assigned successfully to the {BASE_NAME} class.")
+            self.engine = engine
+            self.cache = cache or app_cache.TTLCache(
+                maxsize=MENU_CACHE_MAX_SIZE,
+                ttl=MENU_CACHE_TTL,
+                backend=app_cache.build_backend()
+            )
+            # Nutrition catalog snapshot (see catalog()); replaced, never mutated
+            self._catalog = None
+            self._catalog_checked_at = 0.0
+            self._catalog_lock = threading.Lock()
+            # One session per transaction (see session_scope); the manager itself holds no session,
+            # so it can be shared by every request thread.
+            self.Session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+            app_utils.print_with_format(f"[Health] The session factory was assigned successfully to the {BASE_NAME} class.")
         except Exception as e:
-            app_utils.print_with_format(f"[Health] Error creating session in {BASE_NAME} class {e}", type="error")    
+            app_utils.print_with_format(f"[Health] Error creating session factory in {BASE_NAME} class {e}", type="error")    
             raise
     
+    @contextmanager
+    def session_scope(self):
+        """
+        Provides a transactional scope around a series of operations.
+        
+        Yields:
+            Session: A session used by a single thread, committed on success and rolled back on error.
+        """
+        session = self.Session()
+        try:
+            yield session
+            session.commit()
+            for menu_week_id in session.info.pop('changed_menu_weeks', set()):
+                self.cache.invalidate_prefix(f"menu:{menu_week_id}:")
+            if session.info.pop('catalog_changed', False):
+                self._catalog_checked_at = 0.0
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def create_tables(self):
+        """
+        Creates the health tables if they do not exist.
+        """
+        Database.Base.metadata.create_all(self.engine)
+        with self.session_scope() as session:
+            if session.get(CatalogVersion, NUTRITION_CATALOG) is None:
+                session.add(CatalogVersion(name=NUTRITION_CATALOG, version=0))
+        app_versions.create_table(self.engine, app_versions.WEIGHTS)
+    
+    def catalog(self, force=False):
+        """
+        Returns the nutrition catalog snapshot.
+        
+        The version row is checked at most every CATALOG_CHECK_INTERVAL seconds (and right after
+        a local change), and the catalog is only read again when its version moved, so the hot
+        path costs no database round trip.
+        
+        Args:
+            force (bool): Check the version now, e.g. when an id is missing from the snapshot.
+        
+        Returns:
+            NutritionCatalog: The current snapshot.
+        """
+        catalog = self._catalog
+        if not force and catalog is not None and time.monotonic() - self._catalog_checked_at < CATALOG_CHECK_INTERVAL:
+            return catalog
+        with self._catalog_lock:
+            catalog = self._catalog
+            if not force and catalog is not None and time.monotonic() - self._catalog_checked_at < CATALOG_CHECK_INTERVAL:
+                # Refreshed by another thread while this one waited for the lock
+                return catalog
+            with self.session_scope() as session:
+                version = session.execute(
+                    select(CatalogVersion.version).where(CatalogVersion.name == NUTRITION_CATALOG)
+                ).scalar() or 0
+                if catalog is None or catalog.version != version:
+                    rows = session.execute(
+                        select(Nutrition.id, Nutrition.food_type, Nutrition.name, Nutrition.portion,
+                               Nutrition.example, Nutrition.recipe, Nutrition.price)
+                        .order_by(Nutrition.food_type, Nutrition.name)
+                    )
+                    catalog = NutritionCatalog.build(version, [NutritionItem(*row) for row in rows])
+                    app_utils.print_with_format(f"[Health] Nutrition catalog loaded (version {version}, {len(catalog.items)} items)")
+            self._catalog = catalog
+            self._catalog_checked_at = time.monotonic()
+            return catalog
+    
     def add_weight(self, date, weight, imc, body_fat, subcutaneous_fat, visceral_fat, muscle_mass): 
         """
         Adds a weight log to the database.
@@ -118,18 +400,28 @@ class HealthManager():
             subcutaneousFat (float): The subcutaneous fat of the weight log.
             viseralFat (float): The viseral fat of the weight log.
             muscleMass (float): The muscle mass of the weight log.
+        
+        Returns:
+            dict: Result with the keys result, message and status_code. A reading for a date
+            that already has one replaces it (200) instead of failing on idx_weight_date.
         """
-        new = Weight(date, weight, imc, body_fat, subcutaneous_fat, visceral_fat, muscle_mass)
+        row = {
+            'date': date, 'weight': weight, 'imc': imc, 'body_fat': body_fat,
+            'subcutaneous_fat': subcutaneous_fat, 'visceral_fat': visceral_fat, 'muscle_mass': muscle_mass
+        }
         try:
-            with self.session as session:
-                session.add(new)
-                session.commit()
-                app_utils.print_with_format(f"Weight log {new} created successfully")
-                return app_utils.Response('success', f"Weight log created successfully", 201)
+            # Same upsert on the date as the import, so both paths agree on duplicates
+            with self.session_scope() as session:
+                counts = self.write_weights(session, [row])
+            if counts['inserted']:
+                app_utils.print_with_format(f"Weight log {date} created successfully")
+                return {'result': 'success', 'message': "Weight log created successfully", 'status_code': 201}
+            message = f"Weight log {date} updated successfully" if counts['updated'] else f"Weight log {date} is unchanged"
+            app_utils.print_with_format(message)
+            return {'result': 'success', 'message': message, 'status_code': 200}
         except Exception as e:
-            self.session.rollback()
-            app_utils.print_with_format(f"Error creating weight log {new} {e}", type="error")
-            return app_utils.Response('error', f"Error creating weight log {new} {e}", 500)
+            app_utils.print_with_format(f"Error creating weight log {date} {e}", type="error")
+            return {'result': 'error', 'message': f"Error creating weight log {date} {e}", 'status_code': 500}
 
         
         
@@ -138,18 +430,161 @@ class HealthManager():
         Gets all the weight logs from the database.
         
         Returns:
-            list: List of weight logs.
+            tuple: Weights counter the logs were read at (see get_weights_version) and the list of weight logs.
         """
         try:
-            result = self.session.query(Weight).all()
-            app_utils.print_with_format(f"Activity logs retrieved successfully")
-            return result
+            with self.session_scope() as session:
+                version = app_versions.get_version(session, app_versions.WEIGHTS)
+                result = session.query(Weight).all()
+            app_utils.print_with_format(f"Weight logs retrieved successfully")
+            return version, result
         except Exception as e:
-            app_utils.print_with_format(f"Error retrieving activity logs {e}", type="error")
+            app_utils.print_with_format(f"Error retrieving weight logs {e}", type="error")
             raise
-        finally:
-            self.session.close()       
-            pass
+    
+    def get_weights_version(self):
+        """
+        Gets the weights counter, bumped by every transaction that writes or deletes a log, used
+        to answer conditional requests with a primary key lookup.
+        
+        Returns:
+            Version: Counter and time of the last change.
+        """
+        with self.session_scope() as session:
+            return app_versions.get_version(session, app_versions.WEIGHTS)
+        
+    def write_weights(self, session, rows):
+        """
+        Writes a chunk of imported weight readings idempotently, upserting on the date.
+        
+        One SELECT finds the stored readings of the chunk dates and one upsert writes the new
+        and changed ones. Readings identical to the stored ones are skipped, so retrying a sync
+        writes nothing.
+        
+        Args:
+            session (Session): Session of the import transaction.
+            rows (list): Validated rows (AddWeight fields).
+        
+        Returns:
+            dict: Number of inserted, updated and skipped readings.
+        """
+        counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+        by_date = {}
+        for row in rows:
+            if row['date'] in by_date:
+                # A later reading of the same date replaces the earlier one
+                counts['skipped'] += 1
+            by_date[row['date']] = row
+        
+        stored = {
+            row.date: weight_values(row._mapping)
+            for row in session.execute(
+                select(Weight.date, *[getattr(Weight, column) for column in WEIGHT_VALUE_COLUMNS])
+                .where(Weight.date.in_(list(by_date)))
+            )
+        }
+        changes = []
+        for weight_date, row in by_date.items():
+            values = weight_values(row)
+            current = stored.get(weight_date)
+            if current == values:
+                counts['skipped'] += 1
+                continue
+            counts['inserted' if current is None else 'updated'] += 1
+            changes.append({
+                'id': app_utils.generate_id(),
+                'date': weight_date,
+                **dict(zip(WEIGHT_VALUE_COLUMNS, values))
+            })
+        if changes:
+            upsert_weights(session.connection(), changes)
+            # Upserts do not fire the Weight listeners
+            app_versions.mark_changed(session, app_versions.WEIGHTS)
+        return counts
+    
+    def write_nutrition(self, session, rows):
+        """
+        Writes a chunk of imported nutrition logs with one multi-row INSERT.
+        
+        Args:
+            session (Session): Session of the import transaction.
+            rows (list): Validated rows (AddNutrition fields).
+        """
+        session.execute(insert(Nutrition), [{'id': app_utils.generate_id(), **row} for row in rows])
+        # Bulk INSERTs do not fire the Nutrition listeners
+        mark_catalog_changed(session, session.connection())
+    
+    def get_weight_rollup(self, period="week", date_from=None, date_to=None):
+        """
+        Gets min/max/mean of the weight metrics per day, week or month, with moving averages.
+        
+        Everything is computed in one query: an inner select adds the 7 and 30 entry moving
+        averages (window functions over the entries ordered by date) and the position of each
+        entry in its bucket; the outer select aggregates the buckets and keeps the moving
+        averages of their last entry.
+        
+        Args:
+            period (str): day, week (starting on Monday) or month.
+            date_from (date): First date included.
+            date_to (date): Last date included.
+        
+        Returns:
+            list: One dict per bucket with the bucket start, the number of entries and, per metric,
+            min, max, mean and ma_7 / ma_30 at the end of the bucket.
+        """
+        bucket = app_utils.date_bucket(Weight.date, period, self.engine.dialect.name)
+        order = (Weight.date, Weight.id)
+        moving_averages = [
+            func.avg(getattr(Weight, metric)).over(order_by=order, rows=(-(size - 1), 0)).label(f"{metric}_ma_{size}")
+            for metric in ROLLUP_METRICS for size in MOVING_AVERAGE_WINDOWS
+        ]
+        entries = select(
+            Weight.date,
+            *[getattr(Weight, metric) for metric in ROLLUP_METRICS],
+            bucket.label("bucket"),
+            *moving_averages,
+            func.row_number().over(partition_by=bucket, order_by=(Weight.date.desc(), Weight.id.desc())).label("position")
+        )
+        # Earlier entries still feed the moving averages, so only the upper bound filters the window
+        if date_to:
+            entries = entries.where(Weight.date <= date_to)
+        entries = entries.subquery()
+        
+        columns = [entries.c.bucket, func.count().label("entries")]
+        for metric in ROLLUP_METRICS:
+            column = entries.c[metric]
+            columns += [
+                func.min(column).label(f"{metric}_min"),
+                func.max(column).label(f"{metric}_max"),
+                func.avg(column).label(f"{metric}_mean"),
+            ]
+            columns += [
+                func.max(case((entries.c.position == 1, entries.c[f"{metric}_ma_{size}"]))).label(f"{metric}_ma_{size}")
+                for size in MOVING_AVERAGE_WINDOWS
+            ]
+        query = select(*columns).group_by(entries.c.bucket).order_by(entries.c.bucket)
+        if date_from:
+            query = query.where(entries.c.date >= date_from)
+        
+        try:
+            with self.session_scope() as session:
+                rows = session.execute(query).mappings().all()
+        except Exception as e:
+            app_utils.print_with_format(f"Error computing weight rollup {e}", type="error")
+            raise
+        
+        def number(value):
+            return None if value is None else round(float(value), 2)
+        
+        result = []
+        for row in rows:
+            bucket_data = {"start": str(row["bucket"]), "entries": row["entries"]}
+            for metric in ROLLUP_METRICS:
+                stats = {stat: number(row[f"{metric}_{stat}"]) for stat in ("min", "max", "mean")}
+                stats.update({f"ma_{size}": number(row[f"{metric}_ma_{size}"]) for size in MOVING_AVERAGE_WINDOWS})
+                bucket_data[metric] = stats
+            result.append(bucket_data)
+        return result
         
     def add_nutrition(self, food_type, name, portion, example, recipe, price):
         """
@@ -165,77 +600,221 @@ class HealthManager():
         """
         new = Nutrition(food_type, name, portion, example, recipe, price)
         try:
-            with self.session as session:
+            with self.session_scope() as session:
                 session.add(new)
-                session.commit()
-                app_utils.print_with_format(f"Nutrition log {new} created successfully")
+            app_utils.print_with_format(f"Nutrition log {new} created successfully")
         except Exception as e:
             app_utils.print_with_format(f"Error creating nutrition log {new}", type="error")
-            self.session.rollback()
             raise
-        finally:
-            self.session.close()       
-            pass
     
-    def get_nutrition(self):
+    def get_nutrition(self, food_type=None):
         """
-        Gets all the nutrition logs from the database.
+        Gets the nutrition logs from the in-memory catalog.
+        
+        Args:
+            food_type (str): Only return the logs of this type of food.
         
         Returns:
             list: List of nutrition logs.
         """
         try:
-            result = self.session.query(Nutrition).all()
+            catalog = self.catalog()
+            items = catalog.items if food_type is None else catalog.by_food_type.get(food_type, ())
             app_utils.print_with_format(f"Nutrition logs retrieved successfully")
-            return result
+            return [item._asdict() for item in items]
         except Exception as e:
             app_utils.print_with_format(f"Error retrieving nutrition logs {e}", type="error")
             raise
-        finally:
-            self.session.close()       
-            pass
     
     def add_menu(self,day_of_week, menu_week_id, breakfast_id, breakfast_snack_id, lunch_id, afternoon_snack_id, dinner_id, night_snack_id):
         
         new_menu = Menu(day_of_week, menu_week_id, breakfast_id, breakfast_snack_id, lunch_id, afternoon_snack_id, dinner_id, night_snack_id)
         
         try: 
-            with self.session as session:
+            with self.session_scope() as session:
                 session.add(new_menu)
-                session.commit()
-                app_utils.print_with_format(f"Menu {new_menu} created successfully")
+            app_utils.print_with_format(f"Menu {new_menu} created successfully")
         except Exception as e:
             app_utils.print_with_format(f"Error creating menu {new_menu}", type="error")
     
     def create_week_menu(self, menu_week_id, menu):
         """
-        Creates a week menu.
+        Creates a full week menu atomically.
+        
+        The seven days and every referenced nutrition log are validated up front (the nutrition
+        ids with a single IN query) and the rows are written with one multi-row INSERT in a
+        single transaction, so a week is either fully created or not at all.
         
         Args:
             menu_week_id (str): The id of the week menu.
-            menu (list): The list of menus.
+            menu (list): The menus of the seven days, each with day_of_week and the six meal ids.
+        
+        Returns:
+            dict: Result with the keys result, message and status_code.
         """
-        for m in menu:
-            self.add_menu(m['day_of_week'], menu_week_id, m['breakfast_id'], m['breakfast_snack_id'], m['lunch_id'], m['afternoon_snack_id'], m['dinner_id'], m['night_snack_id'])
+        days = sorted(int(m['day_of_week']) for m in menu)
+        if days != list(range(1, 8)):
+            return {'result': 'error', 'message': "The week menu must contain each day_of_week from 1 to 7 exactly once", 'status_code': 400}
+        
+        nutrition_ids = {m[f"{meal}_id"] for m in menu for meal in MEALS}
+        rows = [
+            {
+                'id': app_utils.generate_id(),
+                'day_of_week': int(m['day_of_week']),
+                'menu_week_id': menu_week_id,
+                **{f"{meal}_id": m[f"{meal}_id"] for meal in MEALS}
+            }
+            for m in menu
+        ]
+        try:
+            with self.session_scope() as session:
+                found = set(session.execute(select(Nutrition.id).where(Nutrition.id.in_(nutrition_ids))).scalars())
+                missing = nutrition_ids - found
+                if missing:
+                    return {'result': 'error', 'message': f"Unknown nutrition ids: {', '.join(sorted(missing))}", 'status_code': 400}
+                if session.execute(select(Menu.id).where(Menu.menu_week_id == menu_week_id).limit(1)).first():
+                    return {'result': 'error', 'message': f"Week menu {menu_week_id} already exists", 'status_code': 409}
+                session.execute(insert(Menu), rows)
+                # Bulk INSERTs do not fire the after_insert listeners
+                mark_menu_week_changed(session, menu_week_id)
+            app_utils.print_with_format(f"Week menu {menu_week_id} created successfully")
+            return {'result': 'success', 'message': f"Week menu {menu_week_id} created successfully", 'status_code': 201}
+        except Exception as e:
+            app_utils.print_with_format(f"Error creating week menu {menu_week_id} {e}", type="error")
+            return {'result': 'error', 'message': f"Error creating week menu {menu_week_id} {e}", 'status_code': 500}
     
     
+    def clone_week_menu(self, menu_week_id, new_menu_week_id, overrides=None):
+        """
+        Copies a week menu into a new week with a single INSERT ... SELECT inside the database.
+        
+        Per-day overrides replace some meals of the copied days through CASE expressions, so the
+        copy takes one statement however many days or meals change. The ids of the source rows are
+        read first so each copy gets a new id from app_utils.generate_id (see sql_new_ids). Override
+        ids are checked with one IN query beforehand; once the source week is known to exist, an
+        empty copy means the target week already exists.
+        
+        Args:
+            menu_week_id (str): The id of the week menu to copy.
+            new_menu_week_id (str): The id of the new week menu.
+            overrides (list): Optional dicts with day_of_week and the meal ids to replace on that day.
+        
+        Returns:
+            dict: Result with the keys result, message and status_code.
+        """
+        overrides = overrides or []
+        menus = Menu.__table__
+        nutrition_ids = {o[f"{meal}_id"] for o in overrides for meal in MEALS if o.get(f"{meal}_id")}
+        
+        meal_columns = []
+        for meal in MEALS:
+            column = menus.c[f"{meal}_id"]
+            whens = [
+                (menus.c.day_of_week == int(o['day_of_week']), literal(o[f"{meal}_id"], column.type))
+                for o in overrides if o.get(f"{meal}_id")
+            ]
+            meal_columns.append(case(*whens, else_=column) if whens else column)
+        try:
+            with self.session_scope() as session:
+                if nutrition_ids:
+                    found = set(session.execute(select(Nutrition.id).where(Nutrition.id.in_(nutrition_ids))).scalars())
+                    if nutrition_ids - found:
+                        return {'result': 'error', 'message': f"Unknown nutrition ids: {', '.join(sorted(nutrition_ids - found))}", 'status_code': 400}
+                source_ids = session.execute(select(menus.c.id).where(menus.c.menu_week_id == menu_week_id)).scalars().all()
+                if not source_ids:
+                    return {'result': 'error', 'message': f"Week menu {menu_week_id} not found", 'status_code': 404}
+                copy = (
+                    select(
+                        app_utils.sql_new_ids(menus.c.id, source_ids),
+                        menus.c.day_of_week,
+                        literal(new_menu_week_id, menus.c.menu_week_id.type),
+                        *meal_columns
+                    )
+                    .where(menus.c.id.in_(source_ids))
+                    .where(~select(menus.c.id).where(menus.c.menu_week_id == new_menu_week_id).exists())
+                )
+                statement = insert(menus).from_select(
+                    ['id', 'day_of_week', 'menu_week_id', *[f"{meal}_id" for meal in MEALS]],
+                    copy
+                )
+                copied = session.execute(statement).rowcount
+                if not copied:
+                    return {'result': 'error', 'message': f"Week menu {new_menu_week_id} already exists", 'status_code': 409}
+                mark_menu_week_changed(session, new_menu_week_id)
+            app_utils.print_with_format(f"Week menu {menu_week_id} cloned into {new_menu_week_id} ({copied} days)")
+            return {'result': 'success', 'message': f"Week menu {menu_week_id} cloned into {new_menu_week_id}", 'status_code': 201}
+        except Exception as e:
+            app_utils.print_with_format(f"Error cloning week menu {menu_week_id} {e}", type="error")
+            return {'result': 'error', 'message': f"Error cloning week menu {menu_week_id} {e}", 'status_code': 500}
+    
     def get_menu_week(self, menu_week_id):
         """
-        Gets the menu from the selected week menu.
+        Gets the resolved menu of a week, served from the week cache when possible.
         
         Args:
             menu_week_id (str): The id of the week menu.
         
         Returns:
-            list: List of menus.
+            dict: The days of the week with their meals, daily cost and the weekly total,
+            or None if the week has no menus.
         """
         try:
-            result = self.session.query(Menu).filter(Menu.menu_week_id == menu_week_id).all()
+            catalog = self.catalog()
+            result = self.cache.get_or_load(
+                f"menu:{menu_week_id}:{catalog.version}",
+                lambda: self._load_menu_week(menu_week_id, catalog),
+                cache_if=lambda result: result is not None
+            )
             app_utils.print_with_format(f"Menu retrieved successfully")
             return result
         except Exception as e:
             app_utils.print_with_format(f"Error retrieving menu {e}", type="error")
             raise
-        finally:
-            self.session.close()       
-            pass
\ No newline at end of file
+    
+    def _load_menu_week(self, menu_week_id, catalog):
+        """
+        Loads a week menu and resolves its meals, prices and costs from the catalog snapshot.
+        
+        Args:
+            menu_week_id (str): The id of the week menu.
+            catalog (NutritionCatalog): Snapshot used to resolve the meals.
+        
+        Returns:
+            dict: The resolved week, or None if the week has no menus.
+        """
+        query = (
+            select(Menu.id, Menu.day_of_week, *[getattr(Menu, f"{meal}_id") for meal in MEALS])
+            .where(Menu.menu_week_id == menu_week_id)
+            .order_by(Menu.day_of_week)
+        )
+        with self.session_scope() as session:
+            rows = session.execute(query).mappings().all()
+        if not rows:
+            return None
+        
+        referenced = {row[f"{meal}_id"] for row in rows for meal in MEALS}
+        if not referenced <= catalog.by_id.keys():
+            # Menus that reference rows newer than the snapshot
+            catalog = self.catalog(force=True)
+        
+        days = []
+        for row in rows:
+            day_meals = {}
+            for meal in MEALS:
+                item = catalog.by_id.get(row[f"{meal}_id"])
+                day_meals[meal] = {
+                    "id": row[f"{meal}_id"],
+                    "name": item.name if item else None,
+                    "price": item.price if item else None,
+                }
+            days.append({
+                "menu_id": row["id"],
+                "day_of_week": row["day_of_week"],
+                "meals": day_meals,
+                "cost": sum(meal["price"] or 0 for meal in day_meals.values()),
+            })
+        return {
+            "menu_week_id": menu_week_id,
+            "days": days,
+            "total_cost": sum(day["cost"] for day in days),
+        }
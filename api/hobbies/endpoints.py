@@ -1,10 +1,11 @@
-from flask import jsonify
+from flask import jsonify, make_response, request
 import utils as app_utils
 
 from apiflask import Schema
 from apiflask.fields import Integer as apiInteger, String as apiString, Date as apiDate
 from apiflask.validators import Length as apiLength, OneOf as apiOneOf, Range as apiRange
 from hobbies.hobbies import HobbieManager
+import ingest
 from datetime import date, timedelta
 from random import randint
 
@@ -14,6 +15,13 @@ class AddActivity(Schema):
     rating = apiInteger(required=True, validate=apiRange(min=1, max=10)) 
     category = apiString(required=True, validate=apiOneOf(['Cine', 'Pelicula', 'Serie', 'Juego', 'Libro', 'Anime', 'Otro'])) 
 
+class ActivityLogQuery(Schema):
+    since = apiString(required=False, metadata={'description': 'The X-Cursor header of a previous response. Only newer activity logs are returned.'})
+
+class StatsQuery(Schema):
+    date_from = apiDate(required=False)
+    date_to = apiDate(required=False)
+
 class Result(Schema):
     result = apiString()
     message = apiString()
@@ -21,11 +29,13 @@ class Result(Schema):
 def random_date():
     return date(2024, randint(1, 12), randint(1, 28)).strftime('%Y-%m-%d')
 
-def configure_endpoints(app, database):
+def configure_endpoints(app, engine):
     
     try:
         
-        hobbies = HobbieManager(database=database)
+        hobbies = HobbieManager(engine)
+        hobbies.create_tables()
+        ingest.register_source(ingest.Source('activities', AddActivity(), hobbies.write_activities))
 
         @app.post('/hobbies/add-activity/')
         @app.doc(tags=['Hobbies'],description='Add an activity log to the database.')
@@ -39,11 +49,37 @@ def configure_endpoints(app, database):
                 return jsonify({'result': 'error', 'message': str(e)})
             
         @app.get('/hobbies/get-activity-log/')
-        @app.doc(tags=['Hobbies'],description='Get all the activity logs from the database.')
+        @app.doc(tags=['Hobbies'],description='Get the activity logs ordered by date. The X-Cursor header marks the logs returned so far; pass it back as since to fetch only the logs added after it.')
+        @app.input(ActivityLogQuery, location='query')
         @app.output(Result, status_code=200)
-        def get_hobbies():
-            result = hobbies.get_hobbies()
-            return jsonify(result)
+        def get_hobbies(query_data):
+            since = query_data.get('since')
+            current = hobbies.get_hobbies_version()
+            cached = app_utils.not_modified(app_utils.make_etag(current.version, request.query_string), current.updated_at)
+            if cached is not None:
+                return cached
+            try:
+                served, cursor, result = hobbies.get_hobbies(since)
+            except ValueError as e:
+                return make_response(jsonify({'result': 'error', 'message': str(e)}), 400)
+            response = jsonify(result)
+            # The validators come from the counter the served logs were read at
+            etag = app_utils.make_etag(served.version, request.query_string)
+            response.headers.update(app_utils.conditional_headers(etag, served.updated_at))
+            response.headers['X-Cursor'] = cursor
+            return response
+        
+        @app.get('/hobbies/stats/<any(category, month, "category-month"):group>')
+        @app.doc(tags=['Hobbies'],description='Get the number of activities and their average rating per category, month (YYYY-MM) or category-month.')
+        @app.input(StatsQuery, location='query')
+        @app.output(Result, status_code=200)
+        def get_activity_stats(group, query_data):
+            try:
+                result = hobbies.get_activity_stats(group, query_data.get('date_from'), query_data.get('date_to'))
+                return jsonify(result)
+            except Exception as e:
+                app_utils.print_with_format(f"[activity-stats] {e}", type="error")
+                return make_response(jsonify({'result': 'error', 'message': str(e)}), 500)
     
     except Exception as e:
         app_utils.print_with_format(e, type="error")
@@ -1,21 +1,33 @@
 from dataclasses import dataclass
-from sqlalchemy import create_engine, ForeignKey, String, Integer, Date, Column, Numeric, DateTime
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import create_engine, ForeignKey, String, Integer, Date, Column, Numeric, DateTime, Index, event, func, insert, select
+from sqlalchemy.orm import Mapped, mapped_column, sessionmaker, object_session
+from contextlib import contextmanager
 from sqlalchemy import String, Integer, Date, Column, Numeric, DateTime
 from bak.database import Database
 import utils as app_utils
+import versions as app_versions
 
 BASE_NAME = "hobbies"
+STATS_GROUPS = ("category", "month", "category-month")
 
 @dataclass
 class ActivityLog(Database.Base):
     __tablename__ = BASE_NAME + "_" +  'activity_log'
+    # Covers the date range filter and the category / month aggregations (count and AVG(rating)),
+    # so get_activity_stats never reads the table rows
+    __table_args__ = (
+        Index('idx_activity_date_category', 'date', 'category', 'rating'),
+        Index('idx_activity_seq', 'seq'),
+    )
     
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=app_utils.generate_uuid)
+    id: Mapped[str] = mapped_column(app_utils.id_column_type(), primary_key=True, default=app_utils.generate_id)
     date: Mapped[Date] = mapped_column(Date())
     title: Mapped[str] = mapped_column(String(60))
     rating: Mapped[int] = mapped_column(Integer)
     category: Mapped[str] = mapped_column(String(40))
+    # Activities counter of the inserting transaction: grows in commit order, unlike (date, id),
+    # so it is the cursor of the logs a client has not seen yet
+    seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     
     def __init__(self, date, title, rating, category):
         self.date = date
@@ -26,16 +38,53 @@ class ActivityLog(Database.Base):
     def __repr__(self) -> str:
         return f"[Date={self.date}, Title={self.title}, Rating={self.rating}, Category={self.category}]"
 
+
+@event.listens_for(ActivityLog, 'before_insert')
+def activity_inserted(mapper, connection, target):
+    target.seq = app_versions.mark_changed(object_session(target), app_versions.ACTIVITIES, connection)
+
+
+@event.listens_for(ActivityLog, 'after_update')
+@event.listens_for(ActivityLog, 'after_delete')
+def activity_changed(mapper, connection, target):
+    app_versions.mark_changed(object_session(target), app_versions.ACTIVITIES, connection)
+
    
 class HobbieManager():
-    def __init__(self, database) -> None:
+    def __init__(self, engine) -> None:
         try:
-            self.db = database
-            self.session = database.Session()
-            app_utils.print_with_format(f"[Hobbies] The database session was assigned successfully to the {BASE_NAME} class.")
+            self.engine = engine
+            # One session per transaction (see session_scope), safe to share across request threads
+            self.Session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+            app_utils.print_with_format(f"[Hobbies] The session factory was assigned successfully to the {BASE_NAME} class.")
         except Exception as e:
-            app_utils.print_with_format(f"[Hobbies] Error creating session in {BASE_NAME} class {e}", type="error")    
+            app_utils.print_with_format(f"[Hobbies] Error creating session factory in {BASE_NAME} class {e}", type="error")    
+            raise
+    
+    @contextmanager
+    def session_scope(self):
+        """
+        Provides a transactional scope around a series of operations.
+        
+        Yields:
+            Session: A session used by a single thread, committed on success and rolled back on error.
+        """
+        session = self.Session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
             raise
+        finally:
+            session.close()
+    
+    def create_tables(self):
+        """
+        Creates the hobbies tables if they do not exist.
+        """
+        Database.Base.metadata.create_all(self.engine)
+        app_versions.create_table(self.engine, app_versions.ACTIVITIES)
     
     def add_activity(self, date, title, rating, category):
         """
@@ -50,42 +99,121 @@ class HobbieManager():
         """
         new = ActivityLog(date, title, rating, category)
         try:
-            self.session.add(new)
-            self.session.commit()
-            self.session.refresh(new)
+            with self.session_scope() as session:
+                session.add(new)
+                session.flush()
             app_utils.print_with_format(f"Activity log {new} created successfully")
             return new
         except Exception as e:
             app_utils.print_with_format(f"Error creating activity log {new} {e}", type="error")
-            self.session.rollback()
             return None
-        finally:
-            self.session.close()       
         
-    def get_hobbies(self):
+    def write_activities(self, session, rows):
+        """
+        Writes a chunk of imported activity logs with one multi-row INSERT.
+        
+        Args:
+            session (Session): Session of the import transaction.
+            rows (list): Validated rows (AddActivity fields).
+        """
+        # Bulk INSERTs do not fire the ActivityLog listeners
+        seq = app_versions.mark_changed(session, app_versions.ACTIVITIES)
+        session.execute(insert(ActivityLog), [{'id': app_utils.generate_id(), 'seq': seq, **row} for row in rows])
+        
+    def get_hobbies(self, since=None):
         """
-        Gets all the activity logs from the database.
+        Gets the activity logs from the database, ordered by date and id.
+        
+        Args:
+            since (str): Cursor returned by a previous call. Only the logs inserted after it are returned.
         
         Returns:
-            list: List of activity logs.
+            tuple: Activities counter the logs were read at (see get_hobbies_version), cursor to pass
+            back as since and the list of activity logs.
+        
+        Raises:
+            ValueError: If the cursor is malformed.
         """
+        query = select(ActivityLog.id, ActivityLog.date, ActivityLog.title, ActivityLog.rating, ActivityLog.category, ActivityLog.seq)
+        if since:
+            values = app_utils.decode_cursor(since)
+            if len(values) != 1 or not isinstance(values[0], int):
+                raise ValueError("Invalid cursor")
+            query = query.where(ActivityLog.seq > values[0])
+        query = query.order_by(ActivityLog.date, ActivityLog.id)
         try:
-            result = self.session.query(ActivityLog).order_by(ActivityLog.date).all()
-            formatted_result = []
-            for activity in result:
-                formatted_date = activity.date.strftime("%Y-%m-%d")
-                formatted_activity = {
+            with self.session_scope() as session:
+                version = app_versions.get_version(session, app_versions.ACTIVITIES)
+                result = session.execute(query).all()
+            # Every transaction up to the counter had committed when it was read, so the client
+            # has all the logs up to it (or up to a later insert the query already saw)
+            cursor = app_utils.encode_cursor(max([version.version, *(activity.seq for activity in result)]))
+            formatted_result = [
+                {
                     "id": activity.id,
-                    "date": formatted_date,
+                    "date": activity.date.strftime("%Y-%m-%d"),
                     "title": activity.title,
                     "rating": activity.rating,
                     "category": activity.category
                 }
-                formatted_result.append(formatted_activity)
+                for activity in result
+            ]
             app_utils.print_with_format(f"Activity logs retrieved successfully")
-            return formatted_result
+            return version, cursor, formatted_result
         except Exception as e:
             app_utils.print_with_format(f"Error retrieving activity logs {e}", type="error")
             raise
-        finally:
-            self.session.close()
\ No newline at end of file
+    
+    def get_activity_stats(self, group, date_from=None, date_to=None):
+        """
+        Gets the number of activities and their average rating per category, month or both.
+        
+        Args:
+            group (str): category, month or category-month.
+            date_from (date): First date included.
+            date_to (date): Last date included.
+        
+        Returns:
+            list: One dict per group with category and/or month, count and average_rating.
+        """
+        if group not in STATS_GROUPS:
+            raise ValueError(f"Invalid group {group}")
+        keys = []
+        if group in ("category", "category-month"):
+            keys.append(ActivityLog.category.label("category"))
+        if group in ("month", "category-month"):
+            keys.append(app_utils.date_bucket(ActivityLog.date, "month", self.engine.dialect.name).label("month"))
+        query = (
+            select(*keys, func.count().label("count"), func.avg(ActivityLog.rating).label("average_rating"))
+            .group_by(*keys)
+            .order_by(*keys)
+        )
+        if date_from:
+            query = query.where(ActivityLog.date >= date_from)
+        if date_to:
+            query = query.where(ActivityLog.date <= date_to)
+        try:
+            with self.session_scope() as session:
+                rows = session.execute(query).mappings().all()
+            result = []
+            for row in rows:
+                stats = dict(row)
+                if "month" in stats:
+                    stats["month"] = str(stats["month"])[:7]
+                stats["average_rating"] = round(float(stats["average_rating"]), 2)
+                result.append(stats)
+            return result
+        except Exception as e:
+            app_utils.print_with_format(f"Error computing activity stats {e}", type="error")
+            raise
+    
+    def get_hobbies_version(self):
+        """
+        Gets the activities counter, bumped by every transaction that writes or deletes a log,
+        used to answer conditional requests with a primary key lookup.
+        
+        Returns:
+            Version: Counter and time of the last change.
+        """
+        with self.session_scope() as session:
+            return app_versions.get_version(session, app_versions.ACTIVITIES)
@@ -0,0 +1,279 @@
+import json
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+import click
+from marshmallow import ValidationError
+from sqlalchemy import String, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column, Session
+from bak.database import Database
+import utils as app_utils
+
+BATCH_SIZE = 500
+CHUNK_SIZE = 1000
+MAX_PENDING_CHUNKS = 4
+MAX_REPORTED_ERRORS = 20
+COUNTERS = ('inserted', 'updated', 'skipped')
+
+
+class IngestCheckpoint(Database.Base):
+    """Last input line committed by an import job, written in the same transaction as the rows."""
+    __tablename__ = 'ingest_checkpoint'
+
+    source: Mapped[str] = mapped_column(String(40), primary_key=True)
+    job: Mapped[str] = mapped_column(String(255), primary_key=True)
+    line: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    counts: Mapped[str] = mapped_column(String(255), nullable=False, default='{}')
+    updated_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False, default=app_utils.utcnow, onupdate=app_utils.utcnow)
+
+
+@dataclass(frozen=True)
+class Source:
+    """
+    An importable dataset.
+
+    Attributes:
+        name (str): Name used by the CLI and the checkpoints.
+        schema: Marshmallow schema that validates one record.
+        write (callable): write(session, rows) stores a chunk of valid rows inside the given
+            transaction and returns its inserted / updated / skipped counts (None means every
+            row was inserted).
+    """
+    name: str
+    schema: Any
+    write: Callable[[Session, List[Dict[str, Any]]], Optional[Dict[str, int]]]
+
+
+SOURCES: Dict[str, Source] = {}
+
+
+def register_source(source: Source) -> None:
+    """Makes a source available to the ingest CLI."""
+    SOURCES[source.name] = source
+
+
+def file_job(path: str) -> str:
+    """Default job key of a local file: the same unchanged file resumes the same job."""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{int(stat.st_mtime)}"[-255:]
+
+
+class _Done:
+    """End of the producer stream, optionally carrying its error."""
+
+    def __init__(self, error: Optional[BaseException] = None) -> None:
+        self.error = error
+
+
+class Ingestor:
+    """
+    Streams CSV / NDJSON records into the database.
+
+    A reader thread parses the file with a generator, validates records in batches and groups
+    the valid rows into chunks. Chunks go through a bounded queue to the calling thread, which
+    writes each one in its own transaction; when the database is slower than the file, the
+    reader blocks on the full queue instead of buffering the file in memory.
+
+    With a job key, each transaction also stores the last input line it covers, so an interrupted
+    import started again with the same job skips what was already committed.
+    """
+
+    def __init__(
+        self,
+        engine,
+        batch_size: int = BATCH_SIZE,
+        chunk_size: int = CHUNK_SIZE,
+        max_pending: int = MAX_PENDING_CHUNKS
+    ) -> None:
+        self.engine = engine
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        Database.Base.metadata.create_all(engine, tables=[IngestCheckpoint.__table__])
+
+    @contextmanager
+    def session_scope(self):
+        """Provide a transactional scope around a chunk."""
+        session = Session(self.engine)
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def checkpoint(self, source: str, job: str) -> Optional[IngestCheckpoint]:
+        """Returns the checkpoint of a job, if it has one."""
+        with self.session_scope() as session:
+            checkpoint = session.get(IngestCheckpoint, (source, job))
+            if checkpoint is not None:
+                session.expunge(checkpoint)
+            return checkpoint
+
+    def reset(self, source: str, job: str) -> None:
+        """Forgets the checkpoint of a job so it starts from the first line again."""
+        with self.session_scope() as session:
+            checkpoint = session.get(IngestCheckpoint, (source, job))
+            if checkpoint is not None:
+                session.delete(checkpoint)
+
+    def run(self, source: Source, stream: BinaryIO, fmt: str = "csv", job: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Imports a file.
+
+        Args:
+            source (Source): What the records are and how to write them.
+            stream (BinaryIO): The file.
+            fmt (str): "csv" or "ndjson".
+            job (str): Checkpoint key. Without it the import always starts at the first line.
+
+        Returns:
+            dict: read / invalid / inserted / updated / skipped counts of this run, the line it
+            resumed after and the first validation errors.
+        """
+        resume_line = 0
+        if job is not None:
+            checkpoint = self.checkpoint(source.name, job)
+            if checkpoint is not None:
+                resume_line = checkpoint.line
+        report = {'source': source.name, 'job': job, 'resumed_after_line': resume_line, 'read': 0, 'invalid': 0, 'errors': []}
+        report.update({counter: 0 for counter in COUNTERS})
+
+        chunks: "queue.Queue" = queue.Queue(maxsize=self.max_pending)
+        stop = threading.Event()
+        reader = threading.Thread(
+            target=self._produce,
+            args=(source, stream, fmt, resume_line, report, chunks, stop),
+            name=f"ingest-{source.name}",
+            daemon=True
+        )
+        reader.start()
+        try:
+            while True:
+                item = chunks.get()
+                if isinstance(item, _Done):
+                    if item.error is not None:
+                        raise item.error
+                    break
+                rows, last_line = item
+                self._write(source, job, rows, last_line, report)
+        finally:
+            stop.set()
+            reader.join()
+        app_utils.print_with_format(
+            f"[INGEST] {source.name}: {report['read']} read, {report['inserted']} inserted, {report['updated']} updated, "
+            f"{report['skipped']} skipped, {report['invalid']} invalid."
+        )
+        return report
+
+    def _produce(self, source, stream, fmt, resume_line, report, chunks, stop) -> None:
+        """Reader thread: parse, validate and hand over chunks until the file ends."""
+
+        def put(item) -> bool:
+            # Blocks while the writer is behind; gives up if the writer stopped
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            # rows holds (line, valid row) pairs; a chunk checkpoints the line of its last row, since
+            # every earlier line is either in that chunk, in a previous one, or invalid
+            rows, batch, last_line = [], [], resume_line
+            for number, record in app_utils.iter_records(stream, fmt):
+                if number <= resume_line:
+                    continue
+                report['read'] += 1
+                batch.append((number, record))
+                last_line = number
+                if len(batch) >= self.batch_size:
+                    rows.extend(self._validate(source, batch, report))
+                    batch = []
+                while len(rows) >= self.chunk_size:
+                    chunk, rows = rows[:self.chunk_size], rows[self.chunk_size:]
+                    if not put(([row for _, row in chunk], chunk[-1][0])):
+                        return
+            rows.extend(self._validate(source, batch, report))
+            if (rows or last_line > resume_line) and not put(([row for _, row in rows], last_line)):
+                return
+            put(_Done())
+        except BaseException as e:
+            put(_Done(e))
+
+    def _validate(self, source, batch, report) -> List[tuple]:
+        """
+        Validates a batch in one schema call, falling back to record by record when some are invalid.
+
+        Returns:
+            list: (line, valid row) pairs.
+        """
+        if not batch:
+            return []
+        records = [record for _, record in batch]
+        if all(record is not None for record in records):
+            try:
+                return list(zip([number for number, _ in batch], source.schema.load(records, many=True)))
+            except ValidationError:
+                pass
+        valid = []
+        for number, record in batch:
+            try:
+                if record is None:
+                    raise ValidationError("Malformed record")
+                valid.append((number, source.schema.load(record)))
+            except ValidationError as e:
+                report['invalid'] += 1
+                if len(report['errors']) < MAX_REPORTED_ERRORS:
+                    report['errors'].append({'line': number, 'errors': e.messages})
+        return valid
+
+    def _write(self, source, job, rows, last_line, report) -> None:
+        """Writes a chunk and its checkpoint in the same transaction."""
+        with self.session_scope() as session:
+            counts = source.write(session, rows) if rows else {}
+            if counts is None:
+                counts = {'inserted': len(rows)}
+            for counter in COUNTERS:
+                report[counter] += counts.get(counter, 0)
+            if job is not None:
+                checkpoint = session.get(IngestCheckpoint, (source.name, job))
+                if checkpoint is None:
+                    checkpoint = IngestCheckpoint(source=source.name, job=job)
+                    session.add(checkpoint)
+                checkpoint.line = last_line
+                checkpoint.counts = json.dumps({counter: report[counter] for counter in COUNTERS})
+
+
+def configure_commands(app, engine) -> None:
+    """Registers the `flask ingest` command for the registered sources."""
+
+    @app.cli.command('ingest')
+    @click.argument('source_name', metavar='SOURCE')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--job', default=None, help='Checkpoint key. Defaults to the file path, size and mtime.')
+    @click.option('--chunk-size', type=int, default=CHUNK_SIZE, show_default=True, help='Rows per transaction.')
+    @click.option('--batch-size', type=int, default=BATCH_SIZE, show_default=True, help='Records validated per schema call.')
+    @click.option('--restart', is_flag=True, help='Ignore the checkpoint and import from the first line.')
+    def ingest_command(source_name, path, job, chunk_size, batch_size, restart):
+        """Stream a CSV or NDJSON file into SOURCE (see the registered sources), resuming interrupted imports."""
+        source = SOURCES.get(source_name)
+        if source is None:
+            raise click.BadParameter(f"Unknown source. Available: {', '.join(sorted(SOURCES))}", param_hint='SOURCE')
+        ingestor = Ingestor(engine, batch_size=batch_size, chunk_size=chunk_size)
+        job = job or file_job(path)
+        if restart:
+            ingestor.reset(source.name, job)
+        with open(path, 'rb') as stream:
+            report = ingestor.run(source, stream, app_utils.record_format(filename=path), job=job)
+        for error in report['errors']:
+            app_utils.print_with_format(f"[INGEST] Line {error['line']}: {error['errors']}", type="warning")
+        if report['resumed_after_line']:
+            app_utils.print_with_format(f"[INGEST] Resumed after line {report['resumed_after_line']}.")
@@ -0,0 +1,35 @@
+"""Activity insert sequence
+
+Add hobbies_activity_log.seq, the activities counter of the inserting
+transaction, and index it for the since cursor of the activity log. Existing
+logs get 0, so a client without a cursor still receives them.
+
+Revision ID: a7d2e9c4b1f3
+Revises: f5c3d8a1e6b7
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7d2e9c4b1f3'
+down_revision = 'f5c3d8a1e6b7'
+branch_labels = None
+depends_on = None
+
+
+def _has_activity_table():
+    return sa.inspect(op.get_bind()).has_table('hobbies_activity_log')
+
+
+def upgrade():
+    if _has_activity_table():
+        op.add_column('hobbies_activity_log', sa.Column('seq', sa.Integer(), nullable=False, server_default='0'))
+        op.create_index('idx_activity_seq', 'hobbies_activity_log', ['seq'])
+
+
+def downgrade():
+    if _has_activity_table():
+        op.drop_index('idx_activity_seq', table_name='hobbies_activity_log')
+        op.drop_column('hobbies_activity_log', 'seq')
@@ -0,0 +1,110 @@
+"""Binary UUID keys
+
+Store every primary and foreign key as BINARY(16) instead of CHAR(36), only
+when ID_STRATEGY=uuid7 on MySQL 8. Existing UUID4 values are converted in
+place; new rows get time-ordered UUID7 values. With the default strategy
+(uuid4) or another database this revision changes nothing, so the keys keep
+the String(36) type the models use.
+
+Only columns that are not already of the target type are converted, so the
+revision (and its downgrade) can be applied to a database in either state.
+
+Revision ID: be53310e43c0
+Revises: d3e3523797f6
+Create Date: 2026-10-18 06:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+import utils as app_utils
+
+# revision identifiers, used by Alembic.
+revision = 'be53310e43c0'
+down_revision = 'd3e3523797f6'
+branch_labels = None
+depends_on = None
+
+# Key columns per table; the primary key is always "id"
+KEY_COLUMNS = {
+    'goals_goal': ['id'],
+    'goals_objective': ['id', 'goal_id'],
+    'health_weight': ['id'],
+    'health_nutrition': ['id'],
+    'health_nutrition_menu': [
+        'id', 'breakfast_id', 'breakfast_snack_id', 'lunch_id',
+        'afternoon_snack_id', 'dinner_id', 'night_snack_id'
+    ],
+    'hobbies_activity_log': ['id'],
+}
+
+
+def _tables_to_convert(binary):
+    """Existing key tables whose id column is not yet of the target type: BINARY(16) when binary, text otherwise."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'mysql':
+        return []
+    inspector = sa.inspect(bind)
+    tables = []
+    for table in KEY_COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        id_type = next(column['type'] for column in inspector.get_columns(table) if column['name'] == 'id')
+        if isinstance(id_type, (sa.BINARY, sa.VARBINARY)) != binary:
+            tables.append(table)
+    return tables
+
+
+def _drop_foreign_keys(tables):
+    """Drop the foreign keys of the given tables and return them so they can be recreated."""
+    inspector = sa.inspect(op.get_bind())
+    foreign_keys = []
+    for table in tables:
+        for fk in inspector.get_foreign_keys(table):
+            op.drop_constraint(fk['name'], table, type_='foreignkey')
+            foreign_keys.append((table, fk))
+    return foreign_keys
+
+
+def _create_foreign_keys(foreign_keys):
+    for table, fk in foreign_keys:
+        op.create_foreign_key(
+            fk['name'], table, fk['referred_table'],
+            fk['constrained_columns'], fk['referred_columns']
+        )
+
+
+def _convert(tables, new_type, expression):
+    """Rewrite every key column into new_type using the given SQL expression of the old value."""
+    for table in tables:
+        for column in KEY_COLUMNS[table]:
+            op.add_column(table, sa.Column(f'{column}_new', new_type, nullable=True))
+            op.execute(f"UPDATE {table} SET {column}_new = {expression.format(column=column)}")
+            if column == 'id':
+                op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY")
+            op.drop_column(table, column)
+            op.alter_column(
+                table, f'{column}_new', new_column_name=column,
+                existing_type=new_type, nullable=False
+            )
+        op.create_primary_key(f'pk_{table}', table, ['id'])
+
+
+def upgrade():
+    if app_utils.ID_STRATEGY != 'uuid7':
+        return
+    tables = _tables_to_convert(binary=True)
+    if not tables:
+        return
+    foreign_keys = _drop_foreign_keys(tables)
+    _convert(tables, mysql.BINARY(16), "UUID_TO_BIN({column})")
+    _create_foreign_keys(foreign_keys)
+
+
+def downgrade():
+    tables = _tables_to_convert(binary=False)
+    if not tables:
+        return
+    foreign_keys = _drop_foreign_keys(tables)
+    _convert(tables, mysql.VARCHAR(36), "BIN_TO_UUID({column})")
+    _create_foreign_keys(foreign_keys)
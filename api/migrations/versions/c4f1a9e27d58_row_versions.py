@@ -0,0 +1,38 @@
+"""Row versions
+
+Add version and updated_at to goals_goal, the validators of GET /goal/<id>,
+so a conditional GET is answered with a primary key lookup. Collections use
+the data_version counters instead.
+
+Revision ID: c4f1a9e27d58
+Revises: be53310e43c0
+Create Date: 2026-10-18 08:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c4f1a9e27d58'
+down_revision = 'be53310e43c0'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ['goals_goal']
+
+
+def _existing_tables():
+    inspector = sa.inspect(op.get_bind())
+    return [table for table in VERSIONED_TABLES if inspector.has_table(table)]
+
+
+def upgrade():
+    for table in _existing_tables():
+        op.add_column(table, sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()))
+
+
+def downgrade():
+    for table in _existing_tables():
+        op.drop_column(table, 'updated_at')
+        op.drop_column(table, 'version')
@@ -0,0 +1,31 @@
+"""Weight date index
+
+Index health_weight.date for the rollup and range queries.
+
+Revision ID: d81b6e3f0a92
+Revises: c4f1a9e27d58
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd81b6e3f0a92'
+down_revision = 'c4f1a9e27d58'
+branch_labels = None
+depends_on = None
+
+
+def _has_weight_table():
+    return sa.inspect(op.get_bind()).has_table('health_weight')
+
+
+def upgrade():
+    if _has_weight_table():
+        op.create_index('idx_weight_date', 'health_weight', ['date'])
+
+
+def downgrade():
+    if _has_weight_table():
+        op.drop_index('idx_weight_date', table_name='health_weight')
@@ -0,0 +1,41 @@
+"""Unique weight date
+
+Make idx_weight_date unique so weight imports can upsert on the date.
+Duplicated readings are collapsed first, keeping the most recently updated one.
+
+Revision ID: e2a7c5d9b314
+Revises: d81b6e3f0a92
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e2a7c5d9b314'
+down_revision = 'd81b6e3f0a92'
+branch_labels = None
+depends_on = None
+
+
+def _has_weight_table():
+    return sa.inspect(op.get_bind()).has_table('health_weight')
+
+
+def upgrade():
+    if not _has_weight_table():
+        return
+    op.execute(
+        "DELETE older FROM health_weight older "
+        "JOIN health_weight newer ON older.date = newer.date "
+        "AND (older.updated_at < newer.updated_at OR (older.updated_at = newer.updated_at AND older.id < newer.id))"
+    )
+    op.drop_index('idx_weight_date', table_name='health_weight')
+    op.create_index('idx_weight_date', 'health_weight', ['date'], unique=True)
+
+
+def downgrade():
+    if not _has_weight_table():
+        return
+    op.drop_index('idx_weight_date', table_name='health_weight')
+    op.create_index('idx_weight_date', 'health_weight', ['date'])
@@ -0,0 +1,32 @@
+"""Activity date category index
+
+Index hobbies_activity_log(date, category, rating), a covering index for the
+activity aggregations (count and average rating per category and month).
+
+Revision ID: f5c3d8a1e6b7
+Revises: e2a7c5d9b314
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f5c3d8a1e6b7'
+down_revision = 'e2a7c5d9b314'
+branch_labels = None
+depends_on = None
+
+
+def _has_activity_table():
+    return sa.inspect(op.get_bind()).has_table('hobbies_activity_log')
+
+
+def upgrade():
+    if _has_activity_table():
+        op.create_index('idx_activity_date_category', 'hobbies_activity_log', ['date', 'category', 'rating'])
+
+
+def downgrade():
+    if _has_activity_table():
+        op.drop_index('idx_activity_date_category', table_name='hobbies_activity_log')
@@ -0,0 +1,34 @@
+import importlib
+import os
+import sys
+import pytest
+from apiflask import APIFlask
+from sqlalchemy import create_engine, event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils as app_utils  # noqa: E402
+
+
+def make_app(engine, *modules):
+    """APIFlask app configured like app.py, with the endpoints of the given modules on the engine."""
+    app = APIFlask(__name__)
+    app.config.update(BASE_RESPONSE_SCHEMA=app_utils.BaseResponse, BASE_RESPONSE_DATA_KEY='data')
+    for module in modules:
+        importlib.import_module(f'{module}.endpoints').configure_endpoints(app, engine)
+    return app
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """Engine on a file-backed SQLite database, shared by several connections and threads."""
+    # Writers wait for the file lock instead of failing with "database is locked", and WAL
+    # lets readers run while a writer holds it
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={'timeout': 60})
+    
+    @event.listens_for(engine, 'connect')
+    def set_wal(dbapi_connection, connection_record):
+        dbapi_connection.execute('PRAGMA journal_mode=WAL')
+    
+    yield engine
+    engine.dispose()
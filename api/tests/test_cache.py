@@ -0,0 +1,40 @@
+import time
+from sqlalchemy import create_engine, text
+import cache as app_cache
+from IA.models import DatabaseBackend, CachedResponse
+
+ANSWER = {"model": "model", "response": "meow", "generation_time": 0.5}
+
+
+def local_lifetime(cache, key):
+    return cache._data[key][1] - time.monotonic()
+
+
+def test_backend_hit_keeps_the_remaining_lifetime():
+    backend = app_cache.LocalBackend()
+    backend.set("key", ANSWER, ttl=5)
+    cache = app_cache.TTLCache(ttl=60, backend=backend)
+    
+    assert cache.get("key") == ANSWER
+    assert local_lifetime(cache, "key") <= 5
+
+
+def test_database_backend_hit_keeps_the_remaining_lifetime():
+    backend = DatabaseBackend(create_engine("sqlite://"))
+    backend.set("key", ANSWER, ttl=5)
+    cache = app_cache.TTLCache(ttl=60, backend=backend)
+    
+    assert cache.get("key") == ANSWER
+    assert local_lifetime(cache, "key") <= 5
+
+
+def test_database_backend_errors_never_fail_a_request():
+    engine = create_engine("sqlite://")
+    backend = DatabaseBackend(engine)
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE {CachedResponse.__tablename__}"))
+    
+    backend.set("key", ANSWER, ttl=5)
+    assert backend.get("key") is app_cache.MISSING
+    backend.delete("key")
+    backend.delete_prefix("k")
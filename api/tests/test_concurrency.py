@@ -0,0 +1,62 @@
+import threading
+from datetime import date, timedelta
+from health.health import HealthManager
+from hobbies.hobbies import HobbieManager
+
+THREADS = 32
+WRITES_PER_THREAD = 25
+
+
+def run_threads(target):
+    errors = []
+    
+    def worker(number):
+        try:
+            target(number)
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_concurrent_activity_writes_and_reads(file_engine):
+    hobbies = HobbieManager(file_engine)
+    hobbies.create_tables()
+    
+    def work(number):
+        for index in range(WRITES_PER_THREAD):
+            new = hobbies.add_activity(date(2024, 1, 1) + timedelta(days=index), f'{number}-{index}', 5, 'Cine')
+            assert new is not None
+            _, _, logs = hobbies.get_hobbies()
+            assert any(log['title'] == f'{number}-{index}' for log in logs)
+    
+    assert run_threads(work) == []
+    _, _, logs = hobbies.get_hobbies()
+    assert sorted(log['title'] for log in logs) == sorted(
+        f'{number}-{index}' for number in range(THREADS) for index in range(WRITES_PER_THREAD)
+    )
+    # Every insert got its own value of the activities counter
+    assert hobbies.get_hobbies_version().version == THREADS * WRITES_PER_THREAD
+
+
+def test_concurrent_weight_writes_and_reads(file_engine):
+    health = HealthManager(file_engine)
+    health.create_tables()
+    
+    def work(number):
+        for index in range(WRITES_PER_THREAD):
+            log_date = date(2024, 1, 1) + timedelta(days=number * WRITES_PER_THREAD + index)
+            result = health.add_weight(log_date, 80 + index, 24.5, 20.0, 10.0, 5.0, 40.0)
+            assert result['status_code'] == 201, result
+            _, weights = health.get_weights()
+            assert any(weight.date == log_date for weight in weights)
+    
+    assert run_threads(work) == []
+    _, weights = health.get_weights()
+    assert len(weights) == THREADS * WRITES_PER_THREAD
+    assert len({weight.date for weight in weights}) == THREADS * WRITES_PER_THREAD
@@ -0,0 +1,138 @@
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import create_engine, event
+from goals.models import GoalManager, LoadStrategy, ModelConfig
+
+
+@pytest.fixture
+def goal_manager():
+    # In-memory SQLite: every session of the test thread shares the same connection
+    engine = create_engine("sqlite://")
+    manager = GoalManager(engine)
+    manager.create_tables()
+    yield manager
+    engine.dispose()
+
+
+def seed_goals(manager, count, objectives=2):
+    goal_date = date.today() + timedelta(days=30)
+    result = manager.add_goals_bulk([
+        {
+            'name': f'goal {number}',
+            'description': 'description',
+            'date': goal_date,
+            'objectives': [
+                {'name': f'objective {index}', 'description': 'description', 'is_boolean': True}
+                for index in range(objectives)
+            ]
+        }
+        for number in range(count)
+    ])
+    assert result['data']['inserted_goals'] == count
+    return result
+
+
+def count_statements(engine, call):
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        result = call()
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return result, statements
+
+
+@pytest.mark.parametrize('count', [5, 50])
+def test_get_goals_selectin_runs_a_fixed_number_of_statements(goal_manager, count):
+    seed_goals(goal_manager, count)
+    version = goal_manager.get_goals_version().version
+    
+    result, statements = count_statements(
+        goal_manager.engine,
+        lambda: goal_manager.get_goals(limit=count, load_strategy=LoadStrategy.SELECTIN, version=version)
+    )
+    
+    assert result['status_code'] == 200
+    assert len(result['data']) == count
+    assert all(len(goal['objectives']) == 2 for goal in result['data'])
+    # Goals counter, the page of goals and one IN query for all their objectives
+    assert len(statements) == 3
+
+
+@pytest.mark.parametrize('count', [5, 50])
+def test_get_goal_joined_runs_a_fixed_number_of_statements(goal_manager, count):
+    goal_id = seed_goals(goal_manager, 1, objectives=count)['data']['items'][0]['id']
+    version = goal_manager.get_goal_version(goal_id).version
+    
+    result, statements = count_statements(
+        goal_manager.engine,
+        lambda: goal_manager.get_goal(goal_id, load_strategy=LoadStrategy.JOINED, version=version)
+    )
+    
+    assert len(result['data']['objectives']) == count
+    # The goal joined with its objectives
+    assert len(statements) == 1
+
+
+def test_get_goals_lazy_loading_runs_a_statement_per_goal(goal_manager):
+    seed_goals(goal_manager, 10)
+    version = goal_manager.get_goals_version().version
+    
+    _, statements = count_statements(
+        goal_manager.engine,
+        lambda: goal_manager.get_goals(limit=10, load_strategy=LoadStrategy.LAZY, version=version)
+    )
+    
+    assert len(statements) == 2 + 10
+
+
+def test_cached_page_runs_no_statement(goal_manager):
+    seed_goals(goal_manager, 5)
+    version = goal_manager.get_goals_version().version
+    goal_manager.get_goals(version=version)
+    
+    result, statements = count_statements(goal_manager.engine, lambda: goal_manager.get_goals(version=version))
+    
+    assert len(result['data']) == 5
+    assert statements == []
+
+
+def test_iter_goals_exports_more_than_one_page(goal_manager):
+    count = ModelConfig.STREAM_CHUNK_SIZE * 2 + 7
+    seed_goals(goal_manager, count, objectives=1)
+    
+    goals, statements = count_statements(goal_manager.engine, lambda: list(goal_manager.iter_goals()))
+    
+    assert len(goals) == count
+    assert len({goal['id'] for goal in goals}) == count
+    assert [goal['id'] for goal in goals] == sorted(goal['id'] for goal in goals)
+    assert all(len(goal['objectives']) == 1 for goal in goals)
+    # A page of goals and its objectives per chunk, never a streamed result left open
+    assert len(statements) == 3 * 2
+
+
+def test_goal_version_moves_only_with_its_own_changes(goal_manager):
+    first, second = (item['id'] for item in seed_goals(goal_manager, 2, objectives=0)['data']['items'])
+    before = goal_manager.get_goal_version(first)
+    
+    goal_manager.add_objective('objective', 'description', second, is_boolean=True)
+    assert goal_manager.get_goal_version(first) == before
+    
+    goal_manager.add_objective('objective', 'description', first, is_boolean=True)
+    after = goal_manager.get_goal_version(first)
+    assert after.version == before.version + 1
+    assert goal_manager.get_goal(first, version=after.version)['version'] == after
+
+
+def test_changes_are_served_without_invalidating_the_cache(goal_manager):
+    seed_goals(goal_manager, 3)
+    assert len(goal_manager.get_goals()['data']) == 3
+    goal_manager.cache.invalidate_prefix = None  # a change must not scan the cache
+    
+    seed_goals(goal_manager, 2)
+    
+    assert len(goal_manager.get_goals()['data']) == 5
@@ -3,30 +3,209 @@ import datetime
 from colorama import Fore,Style
 import uuid
 import hashlib
+import base64
+import csv
+import io
+import decimal
 import logging
+import time
+from flask import Response, request
+from werkzeug.http import http_date
+from sqlalchemy import String as SqlString, BINARY, Date as SqlDate, func, cast, case, literal
+from sqlalchemy.types import TypeDecorator
 from apiflask.fields import String, Integer, Field
 from apiflask import Schema
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterable, Iterator, Tuple, BinaryIO
 from dotenv import load_dotenv
 load_dotenv()
 
+ID_STRATEGY = os.getenv("ID_STRATEGY", "uuid4").lower()
+
 @staticmethod
 def create_response(result: Dict[str, Any]) -> tuple[Dict[str, Any], int]:
     """Create a standardized response format."""
-    return {
+    response = {
         'message': result['message'],
         'status_code': result['status_code'],
         'data': result['data']
-    }, result['status_code']
+    }
+    if result.get('next_cursor') is not None:
+        response['next_cursor'] = result['next_cursor']
+    return response, result['status_code']
 
 
 class BaseResponse(Schema):
     message = String()
     status_code = Integer()
     data = Field()
+    next_cursor = String(required=False)
     
 
 
+NDJSON_MIMETYPE = "application/x-ndjson"
+STREAM_FLUSH_ROWS = 500
+
+
+def json_default(obj: Any) -> Any:
+    """JSON encoder fallback for the types our rows carry (ISO dates, like the marshmallow Date field)."""
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def stream_json_response(rows: Iterable[Dict[str, Any]]) -> Response:
+    """
+    Streams rows as NDJSON or as a JSON array, depending on the Accept header.
+
+    Rows are encoded one by one and flushed every STREAM_FLUSH_ROWS rows, so memory stays
+    flat no matter how many rows the iterable produces.
+
+    Args:
+        rows (Iterable): Rows to encode, usually a generator that reads them page by page.
+
+    Returns:
+        Response: Streaming response.
+    """
+    ndjson = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+    def generate():
+        buffer = []
+        if not ndjson:
+            yield "["
+        for index, row in enumerate(rows):
+            encoded = json.dumps(row, default=json_default, separators=(",", ":"))
+            if ndjson:
+                buffer.append(encoded + "\n")
+            else:
+                buffer.append(encoded if index == 0 else "," + encoded)
+            if len(buffer) >= STREAM_FLUSH_ROWS:
+                yield "".join(buffer)
+                buffer.clear()
+        if buffer:
+            yield "".join(buffer)
+        if not ndjson:
+            yield "]"
+
+    return Response(generate(), mimetype=NDJSON_MIMETYPE if ndjson else "application/json")
+
+
+def record_format(mimetype: Optional[str] = None, filename: Optional[str] = None) -> str:
+    """
+    Guesses the format of an uploaded record file.
+
+    Args:
+        mimetype (str): Content type of the upload.
+        filename (str): Name of the uploaded or local file.
+
+    Returns:
+        str: "ndjson" for NDJSON / JSON Lines, "csv" otherwise.
+    """
+    if mimetype in (NDJSON_MIMETYPE, "application/jsonl", "application/x-jsonlines"):
+        return "ndjson"
+    if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def iter_records(stream: BinaryIO, fmt: str = "csv") -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """
+    Reads a CSV or NDJSON byte stream one record at a time, without loading the whole file.
+
+    CSV headers and values are stripped of the spaces after the separators and empty values
+    become None. A malformed NDJSON line yields None as its record.
+
+    Args:
+        stream (BinaryIO): Binary file-like object (upload, request body, open file).
+        fmt (str): "csv" or "ndjson".
+
+    Yields:
+        tuple: Line number (1 = first data line) and the record dict.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="" if fmt == "csv" else None)
+    if fmt == "csv":
+        reader = csv.DictReader(text, skipinitialspace=True)
+        for number, row in enumerate(reader, start=1):
+            yield number, {
+                key.strip(): (value.strip() or None) if isinstance(value, str) else value
+                for key, value in row.items() if key is not None
+            }
+        return
+    for number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield number, record if isinstance(record, dict) else None
+
+
+def utcnow() -> datetime.datetime:
+    """Current UTC time as a naive datetime, the way DateTime columns store it."""
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def bump_row_version(mapper, connection, target) -> None:
+    """before_update listener that increments the version column used to build ETags."""
+    target.version = (target.version or 0) + 1
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Builds a strong entity tag from the values that identify a representation.
+
+    Args:
+        parts: Row versions, timestamps, query string...
+
+    Returns:
+        str: Unquoted entity tag.
+    """
+    return generate_hash("|".join(str(part) for part in parts))
+
+
+def conditional_headers(etag: str, last_modified: Optional[datetime.datetime]) -> Dict[str, str]:
+    """Returns the ETag and Last-Modified headers of a representation."""
+    headers = {'ETag': f'"{etag}"'}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.replace(tzinfo=datetime.timezone.utc))
+    return headers
+
+
+def with_headers(rv: Any, headers: Dict[str, str]) -> Any:
+    """Attaches headers to a view return value (Response or (body, status) tuple)."""
+    if isinstance(rv, Response):
+        rv.headers.update(headers)
+        return rv
+    body, status = rv[0], rv[1]
+    return body, status, headers
+
+
+def not_modified(etag: str, last_modified: Optional[datetime.datetime]) -> Optional[Response]:
+    """
+    Answers a conditional GET without building the body.
+
+    If-None-Match takes precedence over If-Modified-Since, as in RFC 9110.
+
+    Args:
+        etag (str): Current entity tag of the representation.
+        last_modified (datetime): Last modification of the representation, naive UTC.
+
+    Returns:
+        Response: A 304 response when the client copy is fresh, otherwise None.
+    """
+    fresh = False
+    if request.if_none_match:
+        fresh = request.if_none_match.contains(etag)
+    elif request.if_modified_since and last_modified is not None:
+        fresh = last_modified.replace(microsecond=0, tzinfo=datetime.timezone.utc) <= request.if_modified_since
+    if fresh:
+        return Response(status=304, headers=conditional_headers(etag, last_modified))
+    return None
+
+
 def generate_message(obj: Optional[Any], type: str) -> str:
     if obj is None:
         messages = {
@@ -88,6 +267,79 @@ def generate_uuid() -> str:
     return str(uuid.uuid4())
 
 
+def generate_uuid7() -> str:
+    """
+    Generates a time-ordered UUID (version 7: 48-bit millisecond timestamp followed by random bits).
+
+    Returns:
+        str: UUID generated.
+    """
+    value = (int(time.time() * 1000) & ((1 << 48) - 1)) << 80
+    value |= int.from_bytes(os.urandom(10), "big") & ((1 << 80) - 1)
+    value &= ~(0xF << 76)
+    value |= 0x7 << 76  # version
+    value &= ~(0x3 << 62)
+    value |= 0x2 << 62  # RFC 4122 variant
+    return str(uuid.UUID(int=value))
+
+
+def generate_id() -> str:
+    """
+    Generates a primary key with the strategy selected in ID_STRATEGY (uuid4 or uuid7).
+
+    Returns:
+        str: ID generated.
+    """
+    if ID_STRATEGY == "uuid7":
+        return generate_uuid7()
+    return generate_uuid()
+
+
+class BinaryUUID(TypeDecorator):
+    """Stores a UUID as BINARY(16) and exposes it as its canonical string."""
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        return uuid.UUID(str(value)).bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return value
+        return str(uuid.UUID(bytes=bytes(value)))
+
+
+def id_column_type():
+    """
+    Returns the column type of primary and foreign keys for the selected ID_STRATEGY.
+
+    Returns:
+        BINARY(16) for uuid7, String(36) otherwise.
+    """
+    if ID_STRATEGY == "uuid7":
+        return BinaryUUID()
+    return SqlString(36)
+
+
+def sql_new_ids(column, keys: Iterable[Any]):
+    """
+    Returns a SQL expression that gives every row a new primary key, for INSERT ... SELECT.
+
+    The ids come from generate_id(), so they follow ID_STRATEGY on every dialect; the expression
+    maps each key of the selected rows to its own id, so the SELECT must be limited to those keys.
+
+    Args:
+        column (Column): Unique column of the selected rows, usually their primary key.
+        keys (Iterable): Values of column in the selected rows.
+
+    Returns:
+        ColumnElement: CASE expression producing a value of id_column_type(), NULL for other keys.
+    """
+    return case(*[(column == key, literal(generate_id(), id_column_type())) for key in keys])
+
+
 def generate_hash(text: str) -> str:
     """
     Generates a hash from a text.
@@ -101,6 +353,75 @@ def generate_hash(text: str) -> str:
     return hashlib.sha1(text.encode()).hexdigest()
 
 
+DATE_BUCKETS = ("day", "week", "month")
+
+
+def date_bucket(column, period: str, dialect: str):
+    """
+    Builds a SQL expression that truncates a date column to the start of its day, ISO week or month.
+
+    Args:
+        column: Date column or expression.
+        period (str): One of DATE_BUCKETS.
+        dialect (str): Name of the engine dialect (engine.dialect.name).
+
+    Returns:
+        ColumnElement: Expression of the bucket start date, usable in GROUP BY and PARTITION BY.
+    """
+    if period not in DATE_BUCKETS:
+        raise ValueError(f"Invalid period {period}")
+    if dialect == "mysql":
+        if period == "day":
+            return func.date(column)
+        if period == "week":
+            return func.subdate(column, func.weekday(column))
+        return func.date_format(column, "%Y-%m-01")
+    if dialect == "sqlite":
+        if period == "day":
+            return func.date(column)
+        if period == "week":
+            return func.date(column, "weekday 0", "-6 days")
+        return func.strftime("%Y-%m-01", column)
+    return cast(func.date_trunc(period, column), SqlDate)
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encodes the sort key of the last row of a page into an opaque cursor.
+
+    Args:
+        values: Values of the sort key, in order. Dates are stored as ISO strings.
+
+    Returns:
+        str: URL-safe cursor.
+    """
+    payload = json.dumps([v.isoformat() if isinstance(v, datetime.date) else v for v in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Decodes a cursor created by encode_cursor.
+
+    Args:
+        cursor (str): Cursor received from the client.
+
+    Returns:
+        list: Values of the sort key, in order.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
 def create_env_file(file_path=".env"):
     """Creates a .env file with environment variables."""
     try:
@@ -124,6 +445,21 @@ def create_env_file(file_path=".env"):
                 "LOGGING_ENABLED": "True",
                 "GEMINI_API_KEY": "1234567890",
                 "OPENAI_API_KEY": "1234567890",
+                "CACHE_URL": "", # Optional shared cache, e.g. redis://localhost:6379/0
+                "ID_STRATEGY": "uuid4", # uuid4 (CHAR(36)) or uuid7 (time-ordered BINARY(16), run the migrations first)
+                "FAST_JSON_ENABLED": "false", # true to serialize goal responses with precompiled encoders and orjson
+                "DB_POOL_SIZE": "10", # Connections kept open by the shared engine
+                "DB_MAX_OVERFLOW": "20", # Extra connections allowed above DB_POOL_SIZE under load
+                "DB_POOL_RECYCLE": "3600", # Seconds before a connection is replaced (keep below MySQL wait_timeout)
+                "DB_POOL_TIMEOUT": "30", # Seconds to wait for a free connection before failing
+                "DB_POOL_PRE_PING": "true", # Check connections before handing them out
+                "GEMINI_BASE_URL": "", # Optional Gemini endpoint override (proxy or local stub)
+                "GEMINI_CONNECT_TIMEOUT": "5", # Seconds to open a connection to Gemini
+                "GEMINI_READ_TIMEOUT": "60", # Seconds to wait for a Gemini response
+                "GEMINI_POOL_SIZE": "10", # Keep-alive connections kept open to Gemini
+                "GEMINI_CACHE_TTL": "86400", # Seconds a Gemini answer is reused for the same prompt
+                "GEMINI_CACHE_MAX_SIZE": "512", # Answers kept in memory by each process
+                "GEMINI_CACHE_DB_MAX_ROWS": "10000", # Answers kept in the database (least recently used are dropped)
                 }
         
         with open(file_path, "w") as f:
@@ -204,6 +540,19 @@ class Config:
         self.DEV_DB_NAME = os.getenv("DB_HOST_DEV")
         self.GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
         self.OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+        self.FAST_JSON_ENABLED = (os.getenv("FAST_JSON_ENABLED") or "false").lower() == "true"
+        self.DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE") or 10)
+        self.DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW") or 20)
+        self.DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE") or 3600)
+        self.DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT") or 30)
+        self.DB_POOL_PRE_PING = (os.getenv("DB_POOL_PRE_PING") or "true").lower() == "true"
+        self.GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or None
+        self.GEMINI_CONNECT_TIMEOUT = float(os.getenv("GEMINI_CONNECT_TIMEOUT") or 5)
+        self.GEMINI_READ_TIMEOUT = float(os.getenv("GEMINI_READ_TIMEOUT") or 60)
+        self.GEMINI_POOL_SIZE = int(os.getenv("GEMINI_POOL_SIZE") or 10)
+        self.GEMINI_CACHE_TTL = int(os.getenv("GEMINI_CACHE_TTL") or 86400)
+        self.GEMINI_CACHE_MAX_SIZE = int(os.getenv("GEMINI_CACHE_MAX_SIZE") or 512)
+        self.GEMINI_CACHE_DB_MAX_ROWS = int(os.getenv("GEMINI_CACHE_DB_MAX_ROWS") or 10000)
         
         if self.ENVIRONMENT_TYPE == "development":
             self.SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{self.DEV_DB_USER}:{self.DEV_DB_PASS}@{self.DEV_DB_HOST}:{self.DEV_DB_PORT}/{self.DEV_DB_NAME}"
@@ -0,0 +1,115 @@
+"""
+Change counters of the collections served with ETag / Last-Modified validators.
+
+Every write transaction bumps the counter of the collection it changes, so a conditional GET
+is answered with a primary key lookup instead of aggregating the rows, and deletions move the
+counter like any other change.
+"""
+import datetime
+from typing import NamedTuple, Optional
+from sqlalchemy import String, Integer, DateTime, insert, select, update
+from sqlalchemy.orm import Mapped, mapped_column, Session
+from bak.database import Database
+import utils as app_utils
+
+GOALS = "goals"
+WEIGHTS = "weights"
+ACTIVITIES = "activities"
+
+
+class DataVersion(Database.Base):
+    """Change counter of a collection, bumped in the same transaction as every change to it."""
+    __tablename__ = 'data_version'
+
+    name: Mapped[str] = mapped_column(String(40), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[DateTime] = mapped_column(DateTime, nullable=False, default=app_utils.utcnow)
+
+
+class Version(NamedTuple):
+    """Counter of a collection and the time of its last change (naive UTC)."""
+    version: int
+    updated_at: Optional[datetime.datetime]
+
+
+def create_table(engine, *names: str) -> None:
+    """
+    Creates the counters table if it does not exist, with a row per collection.
+
+    Args:
+        engine (Engine): Shared engine.
+        names (str): Collections whose counters are seeded.
+    """
+    Database.Base.metadata.create_all(engine, tables=[DataVersion.__table__])
+    with Session(engine) as session, session.begin():
+        for name in names:
+            if session.get(DataVersion, name) is None:
+                session.add(DataVersion(name=name, version=0, updated_at=app_utils.utcnow()))
+
+
+def bump_version(connection, name: str) -> int:
+    """
+    Increments the counter of a collection on the connection of the current transaction.
+
+    The UPDATE keeps the row locked until the transaction ends, so concurrent writers get
+    their values in commit order.
+
+    Args:
+        connection (Connection): Connection of the transaction that changes the collection.
+        name (str): Name of the collection.
+
+    Returns:
+        int: The new value of the counter.
+    """
+    table = DataVersion.__table__
+    now = app_utils.utcnow()
+    result = connection.execute(
+        update(table).where(table.c.name == name).values(version=table.c.version + 1, updated_at=now)
+    )
+    if not result.rowcount:
+        connection.execute(insert(table).values(name=name, version=1, updated_at=now))
+        return 1
+    return connection.execute(select(table.c.version).where(table.c.name == name)).scalar_one()
+
+
+def mark_changed(session: Optional[Session], name: str, connection=None) -> Optional[int]:
+    """
+    Bumps the counter of a collection once per transaction of the session.
+
+    Args:
+        session (Session): Session of the transaction.
+        name (str): Name of the collection.
+        connection (Connection): Connection of the flush, when called from a mapper event.
+
+    Returns:
+        int: Value of the counter for this transaction, usable as an insertion sequence.
+    """
+    if session is None:
+        return bump_version(connection, name) if connection is not None else None
+    transaction = session.get_transaction()
+    marked = session.info.get('changed_versions')
+    if marked is None or marked[0] is not transaction:
+        marked = session.info['changed_versions'] = (transaction, {})
+    if name not in marked[1]:
+        marked[1][name] = bump_version(connection if connection is not None else session.connection(), name)
+    return marked[1][name]
+
+
+def get_version(session: Session, name: str) -> Version:
+    """
+    Reads the counter of a collection.
+
+    Read it before the rows in the same session, so the served rows are never older than the
+    counter their validators are built from.
+
+    Args:
+        session (Session): Session that also reads the rows.
+        name (str): Name of the collection.
+
+    Returns:
+        Version: The counter, 0 if the collection was never changed.
+    """
+    row = session.execute(
+        select(DataVersion.version, DataVersion.updated_at).where(DataVersion.name == name)
+    ).first()
+    return Version(row.version, row.updated_at) if row else Version(0, None)
@@ -4,31 +4,66 @@ import pandas as pd
 import matplotlib.pyplot as plt
 
 # Configurar la URL base de la API
-API_URL = "http://localhost:5100/hobbies/get-activity-log/"
+API_BASE = "http://localhost:5100"
+API_URL = f"{API_BASE}/hobbies/get-activity-log/"
+STATS_URL = f"{API_BASE}/hobbies/stats/"
 
 # Título de la aplicación
 st.title("Visualización de Datos de Actividades")
 
-# Realizar una solicitud GET a la API para obtener los datos
-response = requests.get(API_URL)
-if response.status_code == 200:
+# Las actividades ya descargadas se guardan en la sesión junto con el cursor (X-Cursor) de la última
+# respuesta, así cada rerun solo pide a la API las actividades insertadas después y las añade al DataFrame
+def reset_activities():
+    st.session_state.activities = pd.DataFrame(columns=['id', 'date', 'title', 'rating', 'category'])
+    st.session_state.activity_cursor = None
+
+reload = st.button("Recargar todas las actividades")
+if reload or 'activities' not in st.session_state:
+    reset_activities()
+
+def fetch_new_activities():
+    params = {'since': st.session_state.activity_cursor} if st.session_state.activity_cursor else {}
+    response = requests.get(API_URL, params=params)
+    if response.status_code == 400 and st.session_state.activity_cursor:
+        # Cursor que la API ya no reconoce (p. ej. de una versión anterior): se descarga todo de nuevo
+        reset_activities()
+        return fetch_new_activities()
+    if response.status_code != 200:
+        return False
     data = response.json()
-    # Convertir los datos a un DataFrame de pandas
-    df = pd.DataFrame(data)
+    if data:
+        # Convertir los datos nuevos a un DataFrame de pandas y añadirlos a los ya descargados
+        st.session_state.activities = pd.concat([st.session_state.activities, pd.DataFrame(data)], ignore_index=True)
+    st.session_state.activity_cursor = response.headers.get('X-Cursor', st.session_state.activity_cursor)
+    return True
+
+if fetch_new_activities():
+    df = st.session_state.activities
     
     # Mostrar el DataFrame en la aplicación Streamlit
     st.write("Datos obtenidos de la API:")
     st.write(df)
     
-    # Crear una visualización simple usando Matplotlib
-    st.write("Gráfico de Calificaciones por Fecha:")
-    fig, ax = plt.subplots()
-    df['date'] = pd.to_datetime(df['date'])  # Asegúrate de que la columna de fechas esté en formato datetime
-    df = df.sort_values('date')  # Ordenar por fecha
-    ax.plot(df['date'], df['rating'], marker='o')
-    ax.set_xlabel('Fecha')
-    ax.set_ylabel('Calificación')
-    ax.set_title('Calificaciones a lo largo del tiempo')
-    st.pyplot(fig)
+    # Los agregados se calculan en la base de datos (GROUP BY), no sobre el historial completo
+    monthly = requests.get(STATS_URL + "month")
+    by_category = requests.get(STATS_URL + "category")
+    if monthly.status_code == 200 and by_category.status_code == 200:
+        monthly_df = pd.DataFrame(monthly.json())
+        category_df = pd.DataFrame(by_category.json())
+        
+        st.write("Calificación media por mes:")
+        if not monthly_df.empty:
+            fig, ax = plt.subplots()
+            monthly_df['month'] = pd.to_datetime(monthly_df['month'])
+            ax.plot(monthly_df['month'], monthly_df['average_rating'], marker='o')
+            ax.set_xlabel('Mes')
+            ax.set_ylabel('Calificación media')
+            ax.set_title('Calificaciones a lo largo del tiempo')
+            st.pyplot(fig)
+        
+        st.write("Actividades y calificación media por categoría:")
+        st.write(category_df)
+    else:
+        st.error("Error al obtener las estadísticas de la API")
 else:
     st.error("Error al obtener datos de la API")